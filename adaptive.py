@@ -0,0 +1,164 @@
+# Adaptive question selection. Every question that has been answered or
+# skipped becomes a "fact" (e.g. 7 x 8) with a weakness score, kept in an
+# indexed max-heap so the weakest facts can be taken for the next game and
+# a single fact's score can be changed in O(log n). The Tk game and the
+# simulations build their adaptive sets here.
+#
+# The score is an exponential moving average of the time taken, with a
+# skip counting as SKIP_PENALTY seconds. A game set is built from a freshly
+# generated one by overwriting some of its questions with the weakest
+# facts, so nothing is ever re-scored in bulk.
+
+import random
+
+SMOOTHING = 0.3  # weight of the newest answer in the moving average
+SKIP_PENALTY = 30.0  # seconds a skip counts as
+SHARE = 0.5  # at most this share of a game comes from the bank
+
+
+class IndexedHeap():
+    # max-heap of (score, key) with a key -> position map, so scores can be
+    # changed or entries removed without searching
+    def __init__(self):
+        self.heap = []
+        self.pos = {}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, key):
+        return key in self.pos
+
+    def push(self, key, score):
+        if key in self.pos:
+            self.update(key, score)
+            return
+        self.heap.append([score, key])
+        self.pos[key] = len(self.heap) - 1
+        self.sift_up(len(self.heap) - 1)
+
+    def update(self, key, score):
+        i = self.pos[key]
+        old = self.heap[i][0]
+        self.heap[i][0] = score
+        if score > old:
+            self.sift_up(i)
+        else:
+            self.sift_down(i)
+
+    def peek(self):
+        score, key = self.heap[0]
+        return key, score
+
+    def pop(self):
+        top = self.heap[0]
+        last = self.heap.pop()
+        del self.pos[top[1]]
+        if self.heap:
+            self.heap[0] = last
+            self.pos[last[1]] = 0
+            self.sift_down(0)
+        return top[1], top[0]
+
+    def swap(self, i, j):
+        h = self.heap
+        h[i], h[j] = h[j], h[i]
+        self.pos[h[i][1]] = i
+        self.pos[h[j][1]] = j
+
+    def sift_up(self, i):
+        h = self.heap
+        while i > 0:
+            parent = (i - 1) // 2
+            if h[parent][0] >= h[i][0]:
+                break
+            self.swap(i, parent)
+            i = parent
+
+    def sift_down(self, i):
+        h = self.heap
+        n = len(h)
+        while True:
+            largest = i
+            for child in (2*i + 1, 2*i + 2):
+                if child < n and h[child][0] > h[largest][0]:
+                    largest = child
+            if largest == i:
+                break
+            self.swap(i, largest)
+            i = largest
+
+
+class FactBank():
+    # facts are keyed by (op index, first, second); the answer is kept so a
+    # fact can be put back into a QuestionSet as it was
+    def __init__(self):
+        self.heap = IndexedHeap()
+        self.answers = {}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def record(self, key, answer, seconds):
+        # seconds is None for a skip
+        if seconds is None:
+            seconds = SKIP_PENALTY
+        if key in self.heap:
+            score = self.heap.heap[self.heap.pos[key]][0]
+            self.heap.update(key, score + SMOOTHING * (seconds - score))
+        else:
+            self.heap.push(key, seconds)
+            self.answers[key] = answer
+
+    def score(self, key):
+        return self.heap.heap[self.heap.pos[key]][0]
+
+    def weakest(self, k):
+        # the k highest scores, O(k log n); the facts stay in the bank
+        taken = [self.heap.pop() for _ in range(min(k, len(self.heap)))]
+        for key, score in taken:
+            self.heap.push(key, score)
+        return [key for key, score in taken]
+
+
+class AdaptiveScheduler():
+    # one bank per game key, the same keys the prefetcher uses
+    def __init__(self, share=SHARE, rng=random):
+        self.share = share
+        self.rng = rng
+        self.banks = {}
+
+    def bank(self, key):
+        bank = self.banks.get(key)
+        if bank is None:
+            bank = self.banks[key] = FactBank()
+        return bank
+
+    def build(self, key, questions):
+        # overwrite some of a generated set with the weakest facts. Facts
+        # already in the set are left where they are, and repeated
+        # questions are overwritten before any single one, so the set
+        # doesn't gain repeats
+        bank = self.bank(key)
+        n = len(questions)
+        slots = {}  # fact -> the indices asking it
+        for i in range(n):
+            fact = (questions.ops[i], questions.first[i], questions.second[i])
+            slots.setdefault(fact, []).append(i)
+        weakest = bank.weakest(int(n * self.share))
+        facts = [f for f in weakest if f not in slots]
+        repeats = [i for idx in slots.values() for i in idx[1:]]
+        self.rng.shuffle(repeats)
+        if len(repeats) < len(facts):
+            # a weak fact the set already asks is not overwritten either
+            single = [idx[0] for f, idx in slots.items()
+                      if f not in weakest]
+            repeats += self.rng.sample(single, len(facts) - len(repeats))
+        for i, fact in zip(repeats, facts):
+            questions.ops[i], questions.first[i], questions.second[i] = fact
+            questions.answer[i] = bank.answers[fact]
+        return questions
+
+    def record(self, key, questions, i, seconds):
+        fact = (questions.ops[i], questions.first[i], questions.second[i])
+        self.bank(key).record(fact, questions.answer[i], seconds)
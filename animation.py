@@ -0,0 +1,53 @@
+# One frame-driven scheduler for every animated widget. Animations register
+# a step function with the canvas they draw on; a single after() timer runs
+# while at least one of them is active and stops once they are all done.
+#
+# step(now) is called once per frame and returns False when it's finished.
+# Animations whose canvas has been destroyed are dropped without calling
+# them. Per-frame work is capped by a time budget; whatever doesn't fit is
+# run first on the next frame.
+
+from time import perf_counter
+
+
+class Animator():
+    def __init__(self, widget, interval=30, budget=0.008):
+        self.widget = widget  # anything with after(), normally the window
+        self.interval = interval  # ms between frames
+        self.budget = budget  # seconds of step() calls per frame
+        self.animations = []  # [canvas, step, start time]
+        self.after_id = None
+        self.frames = 0
+
+    def add(self, canvas, step, delay=0):
+        self.animations.append([canvas, step, perf_counter() + delay/1000])
+        self.wake()
+
+    def remove(self, canvas):
+        self.animations = [a for a in self.animations if a[0] is not canvas]
+
+    def wake(self):
+        if self.after_id is None and self.animations:
+            self.after_id = self.widget.after(self.interval, self.tick)
+
+    def tick(self):
+        self.after_id = None
+        self.frames += 1
+        now = perf_counter()
+        ran = []
+        keep = []
+        for a in self.animations:
+            if ran and perf_counter() - now > self.budget:
+                break
+            ran.append(a)
+            canvas, step, start = a
+            if not canvas.winfo_exists():
+                continue
+            if start > now or step(now) is not False:
+                keep.append(a)
+        # animations that missed this frame go to the front of the next one
+        self.animations = self.animations[len(ran):] + keep
+        self.wake()
+
+    def active(self):
+        return len(self.animations)
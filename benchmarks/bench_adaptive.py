@@ -0,0 +1,43 @@
+# Adaptive scheduler cost against bank size: recording an answer and
+# building a game set should grow with log(n), not n.
+#
+#   python -m benchmarks.bench_adaptive
+
+import random
+from time import perf_counter
+
+import generator
+from adaptive import AdaptiveScheduler
+
+
+def main():
+    rng = random.Random(0)
+    print("{:>10}{:>14}{:>16}{:>16}".format(
+        "facts", "fill s", "record us/op", "build us/set"))
+    for size in (1000, 100000, 1000000):
+        scheduler = AdaptiveScheduler(rng=rng)
+        bank = scheduler.bank("bench")
+        t = perf_counter()
+        for i in range(size):
+            bank.record((2, i, 7), i * 7, rng.random() * 10)
+        fill = perf_counter() - t
+
+        keys = [(2, rng.randrange(size), 7) for _ in range(100000)]
+        t = perf_counter()
+        for key in keys:
+            bank.record(key, 0, rng.random() * 10)
+        record = (perf_counter() - t) / len(keys)
+
+        sets = 2000
+        fresh = [generator.generate_main("hard") for _ in range(sets)]
+        t = perf_counter()
+        for questions in fresh:
+            scheduler.build("bench", questions)
+        build = (perf_counter() - t) / sets
+
+        print("{:>10,}{:>14.2f}{:>16.2f}{:>16.1f}".format(
+            size, fill, record * 1e6, build * 1e6))
+
+
+if __name__ == "__main__":
+    main()
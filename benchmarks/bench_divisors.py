@@ -0,0 +1,72 @@
+# Build time, memory and size of the division space for every operand
+# range the games use, and division question throughput against the old
+# trial division with retries.
+#
+#   python -m benchmarks.bench_divisors [-n QUESTIONS]
+
+import argparse
+import random
+import sys
+from time import perf_counter
+
+import generator
+from spaces import DivisionSpace
+from benchmarks.legacy import LegacyGame
+
+
+def ranges():
+    for level, r in generator.firstswitch_secondadd.items():
+        yield level, r
+    for var in range(1, 6):
+        bound = 10**var
+        yield "alt level {}".format(var), (bound//10, bound)
+
+
+def space_bytes(space):
+    # the block tables a DivisionSpace keeps; the ints in them are small
+    # and shared
+    return (sys.getsizeof(space.blocks) + sys.getsizeof(space.starts) +
+            sum(sys.getsizeof(block) for block in space.blocks))
+
+
+def legacy_div(first, n):
+    g = LegacyGame()
+    made = 0
+    while made < n:
+        x = random.randint(*first)
+        f = g.factors(x)
+        if len(f) == 0:
+            continue
+        random.sample(list(f), 1)[0]
+        made += 1
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=100000,
+                        help="division questions per range")
+    args = parser.parse_args()
+
+    print("{:<14}{:>16}{:>11}{:>8}{:>8}{:>12}{:>13}{:>13}".format(
+        "range", "operands", "build us", "bytes", "blocks", "questions",
+        "legacy q/s", "space q/s"))
+    for name, first in ranges():
+        t = perf_counter()
+        space = DivisionSpace(first)
+        build = perf_counter() - t
+
+        t = perf_counter()
+        legacy_div(first, args.n)
+        old = args.n / (perf_counter() - t)
+        t = perf_counter()
+        space.fill(random, args.n)
+        new = args.n / (perf_counter() - t)
+
+        print("{:<14}{:>16}{:>11.1f}{:>8,}{:>8}{:>12,}{:>13,.0f}{:>13,.0f}"
+              .format(name, "{}-{}".format(*first), build * 1e6,
+                      space_bytes(space), len(space.blocks), len(space),
+                      old, new))
+
+
+if __name__ == "__main__":
+    main()
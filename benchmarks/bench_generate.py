@@ -0,0 +1,69 @@
+# Question generation throughput: the old one-question-at-a-time loop
+# against the batch generator.
+#
+#   python -m benchmarks.bench_generate [-n QUESTIONS]
+
+import argparse
+import random
+from time import perf_counter
+
+import generator
+from benchmarks.legacy import LegacyGame
+
+LEVELS = ["warmup", "easy", "medium", "hard"]
+# every operator at every alt level
+ALT_ALL = {var: [(var, s) for s in generator.OPS] for var in range(1, 6)}
+
+
+def rate(fn, n):
+    t = perf_counter()
+    fn()
+    return n / (perf_counter() - t)
+
+
+def legacy_main(level, n):
+    g = LegacyGame(difficulty=level)
+    for _ in range(n // generator.SET_SIZE):
+        g.generate_main()
+
+
+def legacy_alt(var, n):
+    g = LegacyGame(var=[var] * len(generator.OPS))
+    for _ in range(n // generator.SET_SIZE):
+        g.generate_alt()
+
+
+def report(name, old, new):
+    print("{:<16}{:>14,.0f}{:>14,.0f}{:>9.1f}x".format(
+        name, old, new, new / old))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=100000,
+                        help="questions per case")
+    args = parser.parse_args()
+    n = args.n
+    random.seed(0)
+
+    print("{:<16}{:>14}{:>14}{:>10}".format("case", "legacy q/s",
+                                           "batch q/s", "speedup"))
+    for level in LEVELS:
+        report(level, rate(lambda: legacy_main(level, n), n),
+               rate(lambda: generator.generate_main(level, n), n))
+    for var, selected in ALT_ALL.items():
+        report("alt level {}".format(var),
+               rate(lambda: legacy_alt(var, n), n),
+               rate(lambda: generator.generate_alt(selected, n), n))
+
+    # one game's worth of questions, the path the GUI takes
+    reps = max(n // generator.SET_SIZE, 1)
+    report("hard, 10/call",
+           rate(lambda: legacy_main("hard", reps * generator.SET_SIZE),
+                reps * generator.SET_SIZE),
+           rate(lambda: [generator.generate_main("hard")
+                         for _ in range(reps)], reps * generator.SET_SIZE))
+
+
+if __name__ == "__main__":
+    main()
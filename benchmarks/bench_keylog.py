@@ -0,0 +1,75 @@
+# Keystroke capture cost: KeyLog.key() on its own, the entry's trace
+# (Game.check_value on a Tcl StringVar) with and without it, and writing a
+# full ring out at the end of a game.
+#
+#   python -m benchmarks.bench_keylog [-n KEYS]
+
+import argparse
+from functools import partial
+from os import path
+from tempfile import mkdtemp
+from time import perf_counter
+from types import SimpleNamespace
+
+from engine import Engine
+from keylog import SIZE, KeyLog
+
+
+class NoKeys():
+    def key(self, question, length, matched, ts=None):
+        pass
+
+
+def typing(game, n):
+    # n writes to the entry, typing and clearing a 4 digit answer
+    sv = game.sv
+    texts = ["1", "12", "123", "1234", ""]
+    t = perf_counter()
+    for i in range(n):
+        sv.set(texts[i % 5])
+    return (perf_counter() - t) / n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=200000, help="keystrokes")
+    args = parser.parse_args()
+    n = args.n
+
+    keylog = KeyLog()
+    t = perf_counter()
+    for i in range(n):
+        keylog.key(7, i & 7, False)
+    print("KeyLog.key       {:>8.2f} us/key".format(
+        (perf_counter() - t) / n * 1e6))
+
+    import tkinter
+    import main as app
+    interp = tkinter.Tcl()
+    app.window = interp
+    app.advance_delay = 150
+    game = SimpleNamespace(sv=tkinter.StringVar(interp), advance=None,
+                           engine=Engine(iter((None,))),
+                           next_question=lambda: None)
+    game.engine.expected = "99999"  # never matched, nothing is scheduled
+    game.sv.trace_add("write", partial(app.Game.check_value, game))
+    app.keylog = NoKeys()
+    without = typing(game, n)
+    app.keylog = KeyLog()
+    recorded = typing(game, n)
+    print("check_value      {:>8.2f} us/key without keys, {:.2f} with: "
+          "{:+.2f}".format(without * 1e6, recorded * 1e6,
+                           (recorded - without) * 1e6))
+
+    filename = path.join(mkdtemp(), "bench.mmkeys")
+    keylog = KeyLog()
+    for i in range(SIZE):
+        keylog.key(i // 5, i % 5, False)
+    t = perf_counter()
+    keylog.flush(filename)
+    print("flush            {:>8.2f} ms for {:,} keys".format(
+        (perf_counter() - t) * 1e3, SIZE))
+
+
+if __name__ == "__main__":
+    main()
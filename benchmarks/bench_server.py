@@ -0,0 +1,144 @@
+# Load test for the classroom server: many clients at once, each playing
+# whole sessions over its own connection and answering straight away.
+# Reports finished sessions per second and the answer round trip (A line
+# sent to RIGHT received) percentiles.
+#
+#   python -m benchmarks.bench_server [-c CLIENTS] [-s SESSIONS]
+#                                     [--level easy] [--connect HOST:PORT]
+#
+# Without --connect a server is started in a separate process, so it does
+# not share an event loop with the clients. Questions the client can't
+# work out from their text (powers, roots, percentages) are skipped, so
+# warmup and easy give the most answers.
+
+import argparse
+import asyncio
+import operator
+import os
+import subprocess
+import sys
+from time import perf_counter, perf_counter_ns
+
+from questions import answer_text
+from stats import LatencyHistogram
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# the operators of a question written "a op b"
+SOLVE = {
+    "+": operator.add,
+    "-": operator.sub,
+    "x": operator.mul,
+    "\u00F7": operator.floordiv,
+}
+
+
+def solve(question):
+    # "12 x 7" -> "84", None for anything that isn't "a op b"
+    parts = question.split()
+    if len(parts) != 3 or parts[1] not in SOLVE:
+        return None
+    return answer_text(SOLVE[parts[1]](float(parts[0]), float(parts[2])))
+
+
+class LoadClient():
+    def __init__(self, host, port, level):
+        self.host, self.port = host, port
+        self.start = "MAIN {}\n".format(level).encode()
+        self.rtt = LatencyHistogram()
+        self.sessions = 0
+        self.skips = 0
+
+    async def session(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(self.start)
+            line = (await reader.readline()).decode()
+            while line.startswith("Q "):
+                answer = solve(line.split(" ", 2)[2])
+                if answer is None:
+                    writer.write(b"SKIP\n")
+                    self.skips += 1
+                    await reader.readline()  # SKIPPED
+                else:
+                    t = perf_counter_ns()
+                    writer.write("A {}\n".format(answer).encode())
+                    reply = await reader.readline()
+                    self.rtt.record(perf_counter_ns() - t)
+                    if not reply.startswith(b"RIGHT"):
+                        raise RuntimeError("server said " + reply.decode())
+                line = (await reader.readline()).decode()
+            if not line.startswith("DONE"):
+                raise RuntimeError("server said " + line)
+            self.sessions += 1
+            writer.write(b"QUIT\n")
+            await reader.readline()  # BYE
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    async def run(self, remaining):
+        # remaining is shared by all clients, one item per session to play
+        while remaining:
+            remaining.pop()
+            await self.session()
+
+
+async def load(host, port, clients, sessions, level):
+    remaining = [None] * sessions
+    players = [LoadClient(host, port, level) for _ in range(clients)]
+    t = perf_counter()
+    await asyncio.gather(*(p.run(remaining) for p in players))
+    elapsed = perf_counter() - t
+    rtt = LatencyHistogram()
+    for p in players:
+        rtt.merge(p.rtt)
+    return (elapsed, sum(p.sessions for p in players), rtt,
+            sum(p.skips for p in players))
+
+
+def start_server():
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "server.py"), "--host",
+         "127.0.0.1", "--port", "0"], stdout=subprocess.PIPE, cwd=ROOT)
+    line = proc.stdout.readline().decode()
+    if not line.startswith("serving on"):
+        proc.kill()
+        raise RuntimeError("server.py did not start: " + line)
+    host, port = line.split()[-1].rsplit(":", 1)
+    return proc, host, int(port)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--clients", type=int, default=200)
+    parser.add_argument("-s", "--sessions", type=int, default=2000)
+    parser.add_argument("--level", default="easy")
+    parser.add_argument("--connect", metavar="HOST:PORT")
+    args = parser.parse_args()
+
+    proc = None
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        port = int(port)
+    else:
+        proc, host, port = start_server()
+    try:
+        elapsed, sessions, rtt, skips = asyncio.run(load(
+            host, port, args.clients, args.sessions, args.level))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    p50, p90, p99 = rtt.percentiles()
+    print("{} clients, {:,} sessions in {:.2f} s: {:,.0f} sessions/s, "
+          "{:,.0f} answers/s, {:,} skipped".format(
+              args.clients, sessions, elapsed, sessions / elapsed,
+              rtt.count / elapsed, skips))
+    print("answer round trip  p50 {:.2f} ms  p90 {:.2f} ms  p99 {:.2f} ms  "
+          "max {:.2f} ms".format(p50 * 1e3, p90 * 1e3, p99 * 1e3,
+                                 (rtt.max or 0) / 1e6))
+
+
+if __name__ == "__main__":
+    main()
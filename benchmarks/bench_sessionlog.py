@@ -0,0 +1,71 @@
+# Session log write and scan speed: buffered appends and one flush, then a
+# scan of the latency and operator columns through the mmap views compared
+# with unpacking every record.
+#
+#   python -m benchmarks.bench_sessionlog [-n RECORDS]
+
+import argparse
+from os import path, remove
+import random
+from tempfile import mkdtemp
+from time import perf_counter
+
+import sessionlog
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=1000000,
+                        help="records to write and scan")
+    args = parser.parse_args()
+    n = args.n
+    filename = path.join(mkdtemp(), "bench.mmlog")
+    rng = random.Random(0)
+
+    # the records are drawn first, so only append() is timed
+    firsts = [rng.randint(1, 1000) for _ in range(n)]
+    seconds = [rng.randint(2, 12) for _ in range(n)]
+    latencies = [rng.randint(5 * 10**8, 10**10) for _ in range(n)]
+
+    log = sessionlog.SessionLog(filename)
+    t = perf_counter()
+    for i, (first, second, ns) in enumerate(zip(firsts, seconds,
+                                                latencies)):
+        log.append(i % 7, first, second, ns, sessionlog.CORRECT, 2,
+                   sessionlog.MAIN, ts=i)
+    appended = perf_counter() - t
+    t = perf_counter()
+    log.flush()
+    flushed = perf_counter() - t
+    print("append  {:>8.0f} ns/record".format(appended / n * 1e9))
+    print("flush   {:>8.1f} ms for {:,} bytes".format(
+        flushed * 1000, path.getsize(filename)))
+
+    t = perf_counter()
+    with sessionlog.LogReader(filename) as reader:
+        latency = reader.column("latency")
+        ops = reader.column("op")
+        mean = sum(latency) / len(reader)
+        # one C-level copy of the byte column, counted without a loop
+        opbytes = ops.tobytes()
+        counts = [opbytes.count(o) for o in range(7)]
+    mapped = perf_counter() - t
+
+    t = perf_counter()
+    with open(filename, "rb") as file:
+        data = file.read()[len(sessionlog.HEADER):]
+    total = 0
+    parsed = [0] * 7
+    for record in sessionlog.RECORD.iter_unpack(data):
+        total += record[3]
+        parsed[record[4]] += 1
+    unpacked = perf_counter() - t
+    assert parsed == counts and total / n == mean
+
+    print("scan    {:>8.1f} ms mmap views, {:.1f} ms unpacking records".format(
+        mapped * 1000, unpacked * 1000))
+    remove(filename)
+
+
+if __name__ == "__main__":
+    main()
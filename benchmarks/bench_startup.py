@@ -0,0 +1,60 @@
+# Cold start of the terminal front end: time from launching a fresh
+# interpreter to the first question being drawn. The game runs on a pseudo
+# terminal and reports back on stderr once the question is on screen.
+#
+#   python -m benchmarks.bench_startup [-r RUNS]
+
+import argparse
+import os
+import pty
+import subprocess
+import sys
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGET_MS = 100
+
+
+def terminal_start(args):
+    # one cold start, returns (ms, whether tkinter got imported)
+    leader, follower = pty.openpty()
+    env = dict(os.environ, TERM=os.environ.get("TERM", "xterm"))
+    t = perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "terminal.py"),
+         "--startup-probe"] + args,
+        stdin=follower, stdout=follower, stderr=subprocess.PIPE, env=env,
+        cwd=ROOT)
+    os.close(follower)
+    line = proc.stderr.readline()
+    ms = (perf_counter() - t) * 1000
+    proc.wait()
+    os.close(leader)
+    if not line.startswith(b"first-question"):
+        raise RuntimeError("terminal.py did not start: " + line.decode() +
+                           proc.stderr.read().decode())
+    return ms, line.split()[1] == b"1"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-r", "--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    for name, game in (("level hard", ["--level", "hard"]),
+                       ("alt \u00F7:5", ["--alt", "\u00F7:5"])):
+        runs = []
+        for _ in range(args.runs):
+            ms, tk = terminal_start(game)
+            if tk:
+                raise RuntimeError("terminal.py imported tkinter")
+            runs.append(ms)
+        runs.sort()
+        median = runs[len(runs) // 2]
+        print("{:<12} median {:6.1f} ms  min {:6.1f} ms  max {:6.1f} ms  "
+              "{}".format(name, median, runs[0], runs[-1],
+                          "ok" if median < TARGET_MS else "SLOW"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Cold start of the Tk front end: time from launching a fresh interpreter
+# to the first frame being drawn, and to the first time the event loop is
+# idle afterwards (the menu takes clicks from then on). main.py reports
+# both on stderr and quits when MENTAL_MATHS_STARTUP_PROBE is set.
+#
+#   python -m benchmarks.bench_tk_startup [-r RUNS]
+#
+# Needs a display; run under xvfb-run on a machine without one.
+
+import argparse
+import os
+import subprocess
+import sys
+from time import perf_counter_ns
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGET_MS = 300  # time to interactive
+
+
+def tk_start():
+    # one cold start, returns (first frame ms, interactive ms, widgets)
+    env = dict(os.environ, MENTAL_MATHS_STARTUP_PROBE="1")
+    t = perf_counter_ns()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "main.py")],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=env, cwd=ROOT)
+    # the timestamps come from the child's perf_counter_ns, which is the
+    # same monotonic clock as ours
+    seen = {}
+    for line in proc.stderr:
+        parts = line.split()
+        if parts and parts[0] in (b"first-frame", b"interactive"):
+            seen[parts[0]] = (int(parts[1]), int(parts[2]))
+            if parts[0] == b"interactive":
+                break
+    proc.wait()
+    if b"interactive" not in seen:
+        raise RuntimeError("main.py did not start: " +
+                           proc.stderr.read().decode())
+    frame = (seen[b"first-frame"][0] - t) / 1e6
+    ready, widgets = seen[b"interactive"]
+    return frame, (ready - t) / 1e6, widgets
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-r", "--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        print("skipped: no DISPLAY (try xvfb-run)")
+        return
+
+    frames, ready = [], []
+    for _ in range(args.runs):
+        frame, interactive, widgets = tk_start()
+        frames.append(frame)
+        ready.append(interactive)
+    for name, runs in (("first frame", frames), ("interactive", ready)):
+        runs.sort()
+        print("{:<12} median {:6.1f} ms  min {:6.1f} ms  max {:6.1f} ms"
+              .format(name, runs[len(runs) // 2], runs[0], runs[-1]))
+    median = ready[len(ready) // 2]
+    print("widgets at start: {}  {}".format(
+        widgets, "ok" if median < TARGET_MS else "SLOW"))
+
+
+if __name__ == "__main__":
+    main()
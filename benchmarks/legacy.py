@@ -0,0 +1,261 @@
+# The per-question generation loops from before generator.py, kept only so
+# the benchmarks have something to compare against. Do not use elsewhere.
+
+from random import randint, sample
+import operator
+from itertools import chain
+
+normal_op = ["+", "-", "x", "\u00F7"]
+
+
+class LegacyGame():
+    def __init__(self, difficulty=None, var=None):
+        self.difficulty = difficulty
+        self.var = var
+
+    def factors(self, n):
+        # chain.from_iterable takes (x, y) as input and returns x y
+        return(set(chain.from_iterable(((self.check(i, n//i) for i in range(
+            2, min(int(n**0.5) + 1, 13)) if n % i == 0)))))
+
+    def format_percentage(self, v):
+        p = v["first"]*100
+        if p % 1 != 0.5:
+            p = round(p)
+        return ("{first}% of {second}").format(first=p, second=v["second"])
+
+    def check(self, a, b):
+        if 1 < b < 13:
+            return (a, b)
+        else:
+            return(a, a)
+
+    def generate_main(self):
+        questions = []
+        op = {
+            '+': operator.add,
+            '-': operator.sub,
+            'x': operator.mul,
+            '\u00F7': operator.floordiv,
+            "\u00B2": operator.pow,
+            "\u221A": operator.pow,
+            "%": operator.mul,
+            # "£": operator.mul,
+        }
+
+        diff_op = {
+            "warmup": 3,
+            "easy": 3,
+            "medium": 6,
+            "hard": 6,
+        }
+
+        firstswitch_secondadd = {
+            "warmup": (1, 10),
+            "easy": (1, 100),
+            "medium": (10, 1000),
+            "hard": (100, 10000)
+        }
+
+        second_mul = {
+            "warmup": (1, 10),
+            "easy": (1, 10),
+            "medium": (1, 10),
+            "hard": (10, 100)
+        }
+
+        second_sub = {
+            "warmup": 1,
+            "easy": 1,
+            "medium": 10,
+            "hard": 100,
+        }
+
+        exp_switch = {
+            3: "\u00B3",
+            4: "\u2074",
+            5: "\u2075",
+            6: "\u2076",
+        }
+
+        root_switch = {
+            3: "\u221B",
+            4: "\u221C",
+            5: "\u2155",
+            6: "\u2159",
+        }
+
+        per_switch = {
+            "medium": (5, 10),
+            "hard": (1, 10),
+        }
+
+        while len(questions) < 10:
+            q = {
+                "first": "",
+                "op": "",
+                "second": "",
+                "answer": "",
+                "time": 0,
+                "format": "",
+            }
+
+            q["op"] = list(op.keys())[
+                randint(0, diff_op.get(self.difficulty, 6))
+            ]
+
+            if q["op"] in normal_op:
+                q["first"] = randint(
+                    *(firstswitch_secondadd.get(self.difficulty, (1, 10)))
+                )
+                if q["op"] == "\u00F7":
+                    f = self.factors(q["first"])
+                    if len(f) == 0:
+                        continue
+                    q["second"] = sample(list(f), 1)[0]
+                    # second generated from 1-12 factors of the first number
+                elif q["op"] == "-":
+                    q["second"] = randint(
+                        second_sub.get(self.difficulty, 1),
+                        q["first"]
+                    )
+                elif q["op"] == "x":
+                    q["second"] = randint(
+                        *(second_mul.get(self.difficulty, (1, 10)))
+                    )
+                elif q["op"] == "+":
+                    q["second"] = randint(
+                        *(firstswitch_secondadd.get(self.difficulty, (1, 10)))
+                    )  # same as generating first number
+                q["format"] = "{} {} {}".format(
+                    q["first"],
+                    q["op"],
+                    q["second"]
+                )
+            else:
+                if q["op"] == "\u00B2":
+                    q["first"] = randint(1, 10)
+                    if self.difficulty == "medium":
+                        q["second"] = 2
+                    elif self.difficulty == "hard":
+                        q["second"] = randint(2, 3)
+                    q["format"] = "{}{}".format(
+                        q["first"],
+                        exp_switch.get(q["second"], "\u00B2")
+                    )
+                elif q["op"] == "\u221A":
+                    i = 1
+                    if self.difficulty == "medium":
+                        i = 2
+                    elif self.difficulty == "hard":
+                        i = randint(2, 3)
+                    q["second"] = 1/i
+                    q["first"] = randint(1, 10) ** i
+                    q["format"] = "{}{}".format(
+                        root_switch.get(i, "\u221A"),
+                        q["first"]
+                    )
+                elif q["op"] == "%":
+                    x = per_switch.get(self.difficulty, (10, 10))
+                    q["first"] = ((randint(1, int(100/x[0]))) * x[0]) / 100
+                    q["second"] = randint(1, 100) * x[1]
+                    q["format"] = self.format_percentage(q)
+                    # percentage = level1: 10s, level2: 5s w/ large numbers,
+                    # level3: 1s w/ large numbers, level4: 1s with small number
+                    # level5: 0.5s with any range
+            q["answer"] = op[q["op"]](q["first"], q["second"])
+            if q["answer"] % 1 == 0:
+                q["answer"] = str(round(q["answer"]))
+            else:
+                q["answer"] = str(round(q["answer"], 4))
+            questions.append(q)
+        return(questions)
+
+    def generate_alt(self):
+        questions = []
+        op = {
+            '+': operator.add,
+            '-': operator.sub,
+            'x': operator.mul,
+            '\u00F7': operator.floordiv,
+            "\u00B2": operator.pow,
+            "\u221A": operator.pow,
+            "%": operator.mul,
+            # "£": operator.mul,
+        }
+
+        per_alt_switch = {
+            1: (10, 10),  # multiples of ten for second
+            2: (5, 10),
+            3: (1, 10),
+            4: (1, 1),  # no multiple, therefore smaller numbers
+            5: (0.5, 10),
+        }
+
+        selected_op = [
+            (self.var[c], v) for c, v in enumerate(list(op.keys()))
+            if self.var[c] != 0
+        ]
+
+        while len(questions) < 10:
+            q = {
+                "first": "",
+                "op": "",
+                "second": "",
+                "answer": "",
+                "time": 0,
+                "format": "",
+            }
+            index = randint(0, len(selected_op) - 1)
+            q["op"] = selected_op[index][1]
+            var = selected_op[index][0]
+
+            if q["op"] in normal_op:
+                bound = 10**(var)
+                q["first"] = randint(bound//10, bound)
+                if q["op"] == "\u00F7":
+                    f = self.factors(q["first"])
+                    if len(f) == 0:
+                        continue
+                    q["second"] = sample(list(f), 1)[0]
+                    # second generated from 1-12 factors of the first number
+                elif q["op"] == "-":
+                    q["second"] = randint(1, q["first"])
+                elif q["op"] == "x":
+                    q["second"] = randint(1, 12)
+                elif q["op"] == "+":
+                    q["second"] = randint(1, bound)
+                    # same as generating first number
+                q["format"] = "{} {} {}".format(
+                    q["first"],
+                    q["op"],
+                    q["second"]
+                )
+            else:
+                bound = 10*(var)
+                if q["op"] == "\u00B2":
+                    q["first"] = randint(1, bound)
+                    # NOTE: base only between 1 and 10 for now
+                    q["second"] = 2
+                    q["format"] = "{}{}".format(q["first"], q["op"])
+                elif q["op"] == "\u221A":
+                    q["first"] = randint(1, bound) ** 2
+                    q["second"] = 1/2
+                    q["format"] = "{}{}".format(q["op"], q["first"])
+                elif q["op"] == "%":
+                    x = per_alt_switch.get(var, (10, 10))
+                    q["first"] = ((randint(1, int(100/x[0]))) * x[0]) / 100
+                    q["second"] = randint(1, 100) * x[1]
+                    q["format"] = self.format_percentage(q)
+                    # percentage = level1: 10s, level2: 5s w/ large numbers,
+                    # level3: 1s w/ large numbers, level4: 1s with small number
+                    # level5: 0.5s with any range
+
+            q["answer"] = op[q["op"]](q["first"], q["second"])
+            if q["answer"] % 1 == 0:
+                q["answer"] = str(round(q["answer"]))
+            else:
+                q["answer"] = str(round(q["answer"], 4))
+
+            questions.append(q)
+        return(questions)
@@ -0,0 +1,282 @@
+# All the per-call costs we track in one run, written out as JSON and
+# compared with a stored baseline:
+#
+#   generate/<level>          MainGame.generate, one game set
+#   alt/<op>:<level>          AltGame.generate for a single operator, and
+#   alt/all:<level>           every operator at one level
+#   divspace/<range>          building the division space for a range
+#   divide/<range>            one division question drawn from it
+#   check/<level>             one keystroke through the StringVar trace
+#                             into Game.check_value and the Engine
+#   stats/<n>                 StatsScreen.show for n questions, needs a
+#                             display (or Xvfb), skipped otherwise
+#
+#   python -m benchmarks.suite                      table
+#   python -m benchmarks.suite --json out.json      also write results
+#   python -m benchmarks.suite --save               replace the baseline
+#   python -m benchmarks.suite --compare [FILE]     against the baseline,
+#                                                   exits 1 on a regression
+#
+# Times are the median over --repeat runs, in microseconds per call.
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+from functools import partial
+from time import perf_counter, sleep
+from types import SimpleNamespace
+
+from engine import Engine
+from keylog import KeyLog
+import generator
+from benchmarks.bench_divisors import ranges
+from questions import OPS
+from spaces import DivisionSpace
+from stats import LearnerProfile, OperatorLatencies
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "baseline.json")
+THRESHOLD = 1.5  # slower than baseline by more than this is a regression
+STATS_SIZES = (10, 1000, 10000)
+
+
+def timed(fn, number, repeat):
+    # median microseconds per call of fn over repeat runs of number calls
+    runs = []
+    for _ in range(repeat):
+        t = perf_counter()
+        for _ in range(number):
+            fn()
+        runs.append((perf_counter() - t) / number * 1e6)
+    runs.sort()
+    return runs[len(runs) // 2]
+
+
+# Each case function yields (name, fn, calls, per): fn is timed over calls
+# calls and does per units of work, so the result is the cost of one unit.
+# Setup that only one case needs happens when that case is reached.
+
+def generate_cases(number):
+    for level in generator.LEVELS:
+        yield ("generate/" + level,
+               partial(generator.generate_main, level), number, 1)
+    for var in range(1, 6):
+        for s in OPS:
+            yield ("alt/{}:{}".format(s, var),
+                   partial(generator.generate_alt, ((var, s),)), number, 1)
+        yield ("alt/all:{}".format(var),
+               partial(generator.generate_alt,
+                       tuple((var, s) for s in OPS)), number, 1)
+
+
+def division_cases(number):
+    rng = random.Random(0)
+    for name, first in ranges():
+        name = name.replace(" ", "-")
+        yield ("divspace/" + name, partial(DivisionSpace, first), number, 1)
+        yield ("divide/" + name,
+               partial(DivisionSpace(first).fill, rng, 1000),
+               max(number // 100, 1), 1000)
+
+
+def check_cases(number):
+    # the entry's StringVar with Game.check_value traced on it, driven the
+    # way typing does: one write per character of each answer
+    import tkinter
+    import main
+    interp = tkinter.Tcl()
+    main.window = interp  # check_value schedules next_question on it
+    main.advance_delay = 150
+    main.keylog = KeyLog()
+    for level in generator.LEVELS:
+        questions = generator.generate_main(level, 1000, random.Random(0))
+        typed = []
+        for i in range(len(questions)):
+            answer = questions.answer_text(i)
+            typed.extend(answer[:j] for j in range(1, len(answer) + 1))
+        game = SimpleNamespace(sv=tkinter.StringVar(interp), engine=None,
+                               advance=None, next_question=lambda: None)
+        game.sv.trace_add(
+            "write", partial(main.Game.check_value, game))
+        yield ("check/" + level, partial(type_answers, game, questions,
+                                         typed),
+               max(number // 1000, 1), len(typed))
+        for job in interp.tk.splitlist(interp.tk.call("after", "info")):
+            interp.after_cancel(job)
+
+
+def type_answers(game, questions, typed):
+    # typed holds every prefix of every answer, in order; the engine moves
+    # on to the next question as each new answer is started
+    game.engine = Engine(iter((questions,)))
+    game.engine.start()
+    game.advance = None
+    sv = game.sv
+    for t in typed:
+        if len(t) == 1 and game.advance is not None:
+            game.advance = None
+            game.engine.answer()
+        sv.set(t)
+
+
+def virtual_display():
+    # start Xvfb on a free display if there is no display but Xvfb exists
+    xvfb = shutil.which("Xvfb")
+    if os.environ.get("DISPLAY") or xvfb is None:
+        return None
+    for n in range(99, 120):
+        if os.path.exists("/tmp/.X11-unix/X{}".format(n)):
+            continue
+        proc = subprocess.Popen([xvfb, ":{}".format(n), "-nolisten", "tcp"],
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL)
+        for _ in range(50):
+            if os.path.exists("/tmp/.X11-unix/X{}".format(n)):
+                os.environ["DISPLAY"] = ":{}".format(n)
+                return proc
+            if proc.poll() is not None:
+                break
+            sleep(0.1)
+        proc.kill()
+    return None
+
+
+def stats_cases(number):
+    # StatsScreen.show plus the layout pass, on a real window
+    import tkinter
+    import main
+    from animation import Animator
+    xvfb = virtual_display()
+    try:
+        try:
+            window = tkinter.Tk()
+        except tkinter.TclError as e:
+            print("stats: skipped ({})".format(e), file=sys.stderr)
+            return
+        window.geometry("800x600")
+        window.rowconfigure(0, weight=1)
+        window.columnconfigure(0, weight=1)
+        main.window = window
+        main.animator = Animator(window)
+        main.profile = LearnerProfile()
+        screen = main.StatsScreen()
+        rng = random.Random(0)
+        for n in STATS_SIZES:
+            questions = generator.generate_main("hard", n, rng)
+            latency = OperatorLatencies()
+            for i in range(n):
+                questions.times[i] = rng.uniform(0.5, 20)
+                latency.record(questions.symbol(i),
+                               int(questions.times[i] * 1e9))
+            game = SimpleNamespace(latency=latency,
+                                   results=lambda qs=questions: qs,
+                                   summary="Time taken: {0:0.1f}s".format)
+            yield ("stats/{}".format(n), partial(show_stats, screen, game),
+                   max(number // 100, 1), 1)
+        window.destroy()
+    finally:
+        if xvfb is not None:
+            xvfb.kill()
+            xvfb.wait()
+            del os.environ["DISPLAY"]
+
+
+def show_stats(screen, game):
+    screen.show(game, 60.0)
+    screen.frame.update_idletasks()
+
+
+GROUPS = (
+    (generate_cases, ("generate/", "alt/")),
+    (division_cases, ("divspace/", "divide/")),
+    (check_cases, ("check/",)),
+    (stats_cases, ("stats/",)),
+)
+
+
+def run(number, repeat, only):
+    results = {}
+    for cases, prefixes in GROUPS:
+        if only and not any(o.startswith(p) or p.startswith(o)
+                            for o in only for p in prefixes):
+            continue  # don't pay for the setup, e.g. starting Xvfb
+        for name, fn, calls, per in cases(number):
+            if only and not any(name.startswith(o) for o in only):
+                continue
+            us = timed(fn, calls, repeat) / per
+            results[name] = round(us, 3)
+            print("{:<24}{:>12.2f} us".format(name, us), file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, threshold):
+    # prints a table, returns the names that got slower than threshold
+    slower = []
+    print("{:<24}{:>12}{:>12}{:>9}".format("case", "baseline", "now",
+                                           "ratio"))
+    for name, us in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print("{:<24}{:>12}{:>12.2f}".format(name, "-", us))
+            continue
+        ratio = us / old
+        flag = ""
+        if ratio > threshold:
+            flag = "  SLOWER"
+            slower.append(name)
+        elif ratio < 1 / threshold:
+            flag = "  faster"
+        print("{:<24}{:>12.2f}{:>12.2f}{:>8.2f}x{}".format(
+            name, old, us, ratio, flag))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=1000,
+                        help="calls per timing run")
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", metavar="PREFIX",
+                        help="cases starting with these, e.g. check/")
+    parser.add_argument("--json", metavar="FILE",
+                        help="write the results here, - for stdout")
+    parser.add_argument("--save", action="store_true",
+                        help="write the results as the new baseline")
+    parser.add_argument("--compare", nargs="?", const=BASELINE,
+                        metavar="FILE", help="baseline to compare with")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    results = run(args.number, args.repeat, args.only)
+    doc = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "number": args.number,
+        "repeat": args.repeat,
+        "unit": "us/call",
+        "results": results,
+    }
+    if args.json == "-":
+        json.dump(doc, sys.stdout, indent=1, sort_keys=True)
+        print()
+    elif args.json:
+        with open(args.json, "w") as out:
+            json.dump(doc, out, indent=1, sort_keys=True)
+    if args.save:
+        with open(BASELINE, "w") as out:
+            json.dump(doc, out, indent=1, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as baseline:
+            old = json.load(baseline)["results"]
+        slower = compare(results, old, args.threshold)
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
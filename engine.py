@@ -0,0 +1,156 @@
+# The quiz itself, without any screen: the current set of questions,
+# progress, timing, answer matching, skips and the running results.
+# The Tk game, the terminal game and the simulation bots all drive an
+# Engine and listen to its events; nothing in here imports tkinter.
+#
+# Times are perf_counter_ns() values. Every method that moves the game on
+# takes an optional now, so a view can pass the moment something really
+# happened and a simulation can run on a clock of its own.
+#
+# Events, passed to every listener as fn(event, engine, *args):
+#   "question", i                   question i of engine.questions is up
+#   "wrong", questions, i           a wrong answer to it; it stays up
+#   "recorded", questions, i, ns, skipped
+#   "batch", questions              an endless or sprint game took a new set
+#   "finished"
+
+from time import perf_counter_ns
+
+from generator import SET_SIZE
+from questions import RecentQuestions
+from stats import OperatorLatencies
+
+# how long a game runs
+FIXED, ENDLESS, SPRINT = range(3)
+LENGTHS = ("10 questions", "endless", "60 s sprint")
+SPRINT_SECONDS = 60
+
+
+class Engine():
+    def __init__(self, batches, length=FIXED, sprint_seconds=SPRINT_SECONDS):
+        # batches: iterator of QuestionSets; a fixed game uses the first,
+        # endless and sprint games take the next whenever one runs out
+        self.batches = batches
+        self.length = length
+        self.sprint_seconds = sprint_seconds
+        self.listeners = []
+        self.latency = OperatorLatencies()
+        # only the aggregates and the last few questions are kept
+        self.recent = RecentQuestions()
+        self.questions = None
+        self.progress = 0
+        self.count = 0  # questions answered or skipped
+        self.wrong = 0  # wrong answers given, where a front end has them
+        self.expected = ""  # answer text of the current question
+        self.started = self.ended = self.qstart = 0
+        self.finished = False
+
+    def listen(self, fn):
+        self.listeners.append(fn)
+
+    def emit(self, event, *args):
+        for fn in self.listeners:
+            fn(event, self, *args)
+
+    def start(self, now=None):
+        if now is None:
+            now = perf_counter_ns()
+        self.questions = next(self.batches)
+        self.progress = 0
+        self.started = self.qstart = now
+        self.expected = self.questions.answer_text(0)
+        self.emit("question", 0)
+
+    def present(self, now=None):
+        # the current question's clock starts now, e.g. once it is drawn
+        self.qstart = perf_counter_ns() if now is None else now
+
+    def matches(self, text):
+        return text == self.expected
+
+    def miss(self):
+        # a wrong answer was given to the current question, e.g. sent to
+        # the server; the question and its clock carry on. The Tk and
+        # terminal games accept an answer as soon as it matches, so they
+        # never call this.
+        self.wrong += 1
+        self.emit("wrong", self.questions, self.progress)
+
+    def answer(self, now=None):
+        # the current question was answered right at now; returns the ns
+        if now is None:
+            now = perf_counter_ns()
+        qs, i = self.questions, self.progress
+        ns = now - self.qstart
+        qs.times[i] = ns / 1e9
+        self.latency.record(qs.symbol(i), ns)
+        self.emit("recorded", qs, i, ns, False)
+        self.advance(now)
+        return ns
+
+    def skip(self, now=None):
+        if now is None:
+            now = perf_counter_ns()
+        qs, i = self.questions, self.progress
+        qs.skip(i)
+        self.latency.skip()
+        self.emit("recorded", qs, i, 0, True)
+        self.advance(now)
+
+    def advance(self, now):
+        qs, i = self.questions, self.progress
+        self.progress += 1
+        self.count += 1
+        if self.length != FIXED:
+            self.recent.add(qs, i)
+            if self.length == SPRINT and self.time_left(now) <= 0:
+                self.finish(now)
+                return
+            if self.progress == len(qs):
+                self.questions = next(self.batches)
+                self.progress = 0
+                self.emit("batch", self.questions)
+        if self.progress < len(self.questions):
+            self.expected = self.questions.answer_text(self.progress)
+            self.qstart = now
+            self.emit("question", self.progress)
+        else:
+            self.finish(now)
+
+    def finish(self, now=None):
+        if self.finished:
+            return
+        self.finished = True
+        self.ended = perf_counter_ns() if now is None else now
+        self.emit("finished")
+
+    def time_left(self, now=None):
+        # seconds left in a sprint
+        if now is None:
+            now = perf_counter_ns()
+        return self.sprint_seconds - (now - self.started) / 1e9
+
+    def fraction(self, now=None):
+        # how full the progress bar is
+        if self.length == SPRINT:
+            return min(1 - self.time_left(now) / self.sprint_seconds, 1)
+        if self.length == ENDLESS:
+            return (self.count % SET_SIZE) / SET_SIZE  # laps
+        return self.progress / len(self.questions)
+
+    def duration(self):
+        return (self.ended - self.started) / 1e9
+
+    def results(self):
+        # what a results table shows
+        if self.length == FIXED:
+            return self.questions
+        return self.recent
+
+    def summary(self, diff):
+        if self.length == SPRINT:
+            return "Answered {} in {}s".format(
+                self.count - self.latency.skips, self.sprint_seconds)
+        if self.length == ENDLESS:
+            return "{} questions in {:0.1f}s".format(self.count, diff)
+        return "Time taken: {0:0.1f}s".format(diff)
@@ -0,0 +1,118 @@
+# Bulk export of questions and answers for worksheets, using the MainGame
+# level or AltGame operator rules. Generation is split into chunks that run
+# in a process pool; chunk i always uses its own random.Random seeded from
+# (--seed, i), so the same arguments give the same file whatever the
+# number of workers. Chunks are written in order as they finish, with only
+# a few in flight, so memory stays flat however many questions are asked
+# for.
+#
+#   python export.py --level hard -n 10000000 -o hard.csv
+#   python export.py --alt x:2 %:1 -n 500 --format jsonl --seed 7
+#
+# Columns: n, question, answer, op, first, second.
+
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from generator import LEVELS, generate_alt, generate_main, parse_alt
+from questions import num
+
+CHUNK = 50000  # questions per task
+FIELDS = ("n", "question", "answer", "op", "first", "second")
+
+
+def chunk_rng(seed, index):
+    # a string seed is hashed (sha512) by random.seed, so neighbouring
+    # chunks get unrelated streams
+    return random.Random("mental-maths:{}:{}".format(seed, index))
+
+
+def export_chunk(choice, seed, index, size, fmt):
+    # runs in a worker; returns the chunk's rows as text
+    kind, value = choice
+    rng = chunk_rng(seed, index)
+    if kind == "main":
+        qs = generate_main(value, size, rng)
+    else:
+        qs = generate_alt(value, size, rng)
+    start = index * CHUNK
+    rows = ((start + i + 1, qs.format(i), qs.answer_text(i), qs.symbol(i),
+             num(qs.first[i]), num(qs.second[i])) for i in range(size))
+    out = io.StringIO()
+    if fmt == "csv":
+        csv.writer(out, lineterminator="\n").writerows(rows)
+    else:
+        for row in rows:
+            out.write(json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False))
+            out.write("\n")
+    return out.getvalue()
+
+
+def chunks(n):
+    # (index, size) of every chunk
+    for index, start in enumerate(range(0, n, CHUNK)):
+        yield index, min(CHUNK, n - start)
+
+
+def export(out, choice, n, seed=0, fmt="csv", workers=None):
+    if fmt == "csv":
+        out.write(",".join(FIELDS) + "\n")
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for index, size in chunks(n):
+            out.write(export_chunk(choice, seed, index, size, fmt))
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        pending = []  # futures in chunk order, at most 2 per worker
+        for index, size in chunks(n):
+            pending.append(pool.submit(export_chunk, choice, seed, index,
+                                       size, fmt))
+            if len(pending) >= 2 * workers:
+                out.write(pending.pop(0).result())
+        for future in pending:
+            out.write(future.result())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export questions and "
+                                     "answers for worksheets")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--level", choices=LEVELS)
+    group.add_argument("--alt", nargs="+", metavar="OP:LEVEL")
+    parser.add_argument("-n", type=int, default=100, help="questions")
+    parser.add_argument("-o", "--output", default="-",
+                        help="file to write, - for stdout")
+    parser.add_argument("--format", choices=("csv", "jsonl"), default=None,
+                        help="default: from the file name, else csv")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="processes (default: one per core)")
+    args = parser.parse_args(argv)
+
+    if args.level:
+        choice = ("main", args.level)
+    else:
+        selected = parse_alt(args.alt)
+        if selected is None:
+            parser.error("expected OP:LEVEL with LEVEL 1-5")
+        choice = ("alt", selected)
+    fmt = args.format
+    if fmt is None:
+        fmt = "jsonl" if args.output.endswith(".jsonl") else "csv"
+
+    if args.output == "-":
+        sys.stdout.reconfigure(encoding="utf-8")
+        export(sys.stdout, choice, args.n, args.seed, fmt, args.workers)
+    else:
+        with open(args.output, "w", encoding="utf-8", newline="") as out:
+            export(out, choice, args.n, args.seed, fmt, args.workers)
+
+
+if __name__ == "__main__":
+    main()
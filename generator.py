@@ -0,0 +1,174 @@
+# Batch question generation for MainGame and AltGame. Kept free of tkinter
+# so large practice sets can be built without a display.
+#
+# Instead of building one question at a time, the operator for every slot
+# is drawn first and then each operation fills all of its slots in a single
+# pass over plain lists, which are finally scattered into a QuestionSet.
+# Each operation draws its slots from its question space (spaces.py)
+# without replacement, so a set has no repeated questions unless it is
+# bigger than the space.
+#
+# The spaces for a level or an AltGame selection are built once into a
+# Plan and kept in an LRU cache, so the Tk game, the server, export and the
+# simulations all share them and a set only costs the sampling itself.
+
+from functools import lru_cache
+import operator
+import random
+from questions import OPS, QuestionSet
+from spaces import (DivisionSpace, GridSpace, PercentSpace, PowerSpace,
+                    RootSpace, SubtractSpace)
+
+
+SET_SIZE = 10  # questions per game
+
+diff_op = {
+    "warmup": 3,
+    "easy": 3,
+    "medium": 6,
+    "hard": 6,
+}
+
+firstswitch_secondadd = {
+    "warmup": (1, 10),
+    "easy": (1, 100),
+    "medium": (10, 1000),
+    "hard": (100, 10000)
+}
+
+second_mul = {
+    "warmup": (1, 10),
+    "easy": (1, 10),
+    "medium": (1, 10),
+    "hard": (10, 100)
+}
+
+second_sub = {
+    "warmup": 1,
+    "easy": 1,
+    "medium": 10,
+    "hard": 100,
+}
+
+LEVELS = list(diff_op)  # MainGame levels, easiest first
+
+per_switch = {
+    "medium": (5, 10),
+    "hard": (1, 10),
+}
+
+per_alt_switch = {
+    1: (10, 10),  # multiples of ten for second
+    2: (5, 10),
+    3: (1, 10),
+    4: (1, 1),  # no multiple, therefore smaller numbers
+    5: (0.5, 10),
+}
+
+
+def randints(rng, lo, hi, k):
+    # k uniform integers in [lo, hi]; one bound method call per item is
+    # much cheaper than randint()
+    r = rng.random
+    span = hi - lo + 1
+    return [lo + int(r()*span) for _ in range(k)]
+
+
+def main_spaces(difficulty):
+    # (op index, space) for every operator available at this level
+    fs = firstswitch_secondadd.get(difficulty, (1, 10))
+    exps = {"medium": (2,), "hard": (2, 3)}.get(difficulty, (2,))
+    spaces = [
+        GridSpace(fs, fs, operator.add),
+        SubtractSpace(fs, second_sub.get(difficulty, 1)),
+        GridSpace(fs, second_mul.get(difficulty, (1, 10)), operator.mul),
+        DivisionSpace(fs),
+        PowerSpace((1, 10), exps),
+        RootSpace((1, 10), exps),
+        PercentSpace(per_switch.get(difficulty, (10, 10))),
+    ]
+    return list(enumerate(spaces))[:diff_op.get(difficulty, 6) + 1]
+
+
+def alt_space(o, var):
+    s = OPS[o]
+    if o < 4:
+        bound = 10**(var)
+        first = (bound//10, bound)
+        if s == "\u00F7":
+            return DivisionSpace(first)
+        elif s == "-":
+            return SubtractSpace(first, 1)
+        elif s == "x":
+            return GridSpace(first, (1, 12), operator.mul)
+        return GridSpace(first, (1, bound), operator.add)
+    bound = 10*(var)
+    if s == "\u00B2":
+        # NOTE: base only between 1 and 10 for now
+        return PowerSpace((1, bound), (2,))
+    elif s == "\u221A":
+        return RootSpace((1, bound), (2,))
+    return PercentSpace(per_alt_switch.get(var, (10, 10)))
+
+
+def assemble(spaces, picks, rng):
+    # picks[i] is the index into spaces used for question i
+    qs = QuestionSet(len(picks))
+    slots = [[] for _ in spaces]
+    for i, p in enumerate(picks):
+        slots[p].append(i)
+    for (o, space), idx in zip(spaces, slots):
+        if not idx:
+            continue
+        for i, a, b, c in zip(idx, *space.fill(rng, len(idx))):
+            qs.ops[i] = o
+            qs.first[i] = a
+            qs.second[i] = b
+            qs.answer[i] = c
+    return qs
+
+
+class Plan():
+    # the (op index, space) pairs one level or selection draws from; never
+    # changed once built, so a cached plan can be shared between threads
+    __slots__ = ("spaces", "last")
+
+    def __init__(self, spaces):
+        self.spaces = tuple(spaces)
+        self.last = len(self.spaces) - 1
+
+    def generate(self, n=SET_SIZE, rng=random):
+        # every operator is equally likely in every slot
+        return assemble(self.spaces, randints(rng, 0, self.last, n), rng)
+
+
+@lru_cache(maxsize=None)  # one per level, there are only a few
+def main_plan(difficulty):
+    return Plan(main_spaces(difficulty))
+
+
+@lru_cache(maxsize=256)
+def alt_plan(selected_op):
+    return Plan((OPS.index(s), alt_space(OPS.index(s), var))
+                for var, s in selected_op)
+
+
+def generate_main(difficulty, n=SET_SIZE, rng=random):
+    return main_plan(difficulty).generate(n, rng)
+
+
+def parse_alt(items):
+    # ["x:2", "%:1"] -> ((2, "x"), (1, "%")), None if any item is invalid
+    selected = []
+    for item in items:
+        s, _, var = item.partition(":")
+        if s not in OPS or not var.isdigit() or not 1 <= int(var) <= 5:
+            return None
+        selected.append((int(var), s))
+    return tuple(selected) or None
+
+
+def generate_alt(selected_op, n=SET_SIZE, rng=random):
+    # selected_op: (level, op symbol) pairs as built from the alt menu.
+    # The plan cache needs a hashable key, so a list is made a tuple.
+    return alt_plan(tuple(selected_op)).generate(n, rng)
@@ -0,0 +1,163 @@
+# Every keystroke in the Tk game's answer box, for looking at time to
+# first key, hesitation and corrections.
+#
+# Keys go into a ring of preallocated typed arrays, one per field, so
+# recording a key is a few array stores and no objects are made per key.
+# The ring is written out when a game ends (and as an endless game goes)
+# to a file per learner next to the session log: an 8 byte header and
+# then fixed-width 16 byte records:
+#
+#   offset  type     field
+#        0  int64    ts        wall clock time of the key (ns since epoch)
+#        8  uint32   question  questions answered or skipped before it
+#       12  uint16   length    characters in the box after the key
+#       14  uint8    flags     SHOWN / TYPED / DELETED / MATCHED
+#       15  1 byte padding
+#
+# Times in the ring are perf_counter_ns() values, which never go back; they
+# are moved to the wall clock only when written.
+#
+#   python keylog.py [FILE]   summary of a key file, the learner's default
+
+from array import array
+from os import makedirs, path
+import struct
+import sys
+from time import perf_counter_ns, time_ns
+
+from sessionlog import HISTORY_DIR, learner
+from stats import LatencyHistogram
+
+MAGIC = b"MMKEYS\x00\x01"  # name, version 1
+RECORD = struct.Struct("<qIHBx")
+SIZE = 4096  # keys kept between flushes, a power of two
+
+SHOWN = 1  # a question went up; length is 0
+TYPED = 2  # the text got longer
+DELETED = 4  # the text got shorter or was replaced: a correction
+MATCHED = 8  # the text is now the right answer
+
+
+def keys_path(name=None):
+    return path.join(HISTORY_DIR, (name or learner()) + ".mmkeys")
+
+
+class KeyLog():
+    def __init__(self, size=SIZE):
+        if size & (size - 1):
+            raise ValueError("size must be a power of two")
+        self.mask = size - 1
+        self.ts = array('q', bytes(8 * size))
+        self.question = array('I', bytes(4 * size))
+        self.length = array('H', bytes(2 * size))
+        self.flags = array('B', bytes(size))
+        self.written = 0  # keys ever added
+        self.flushed = 0  # keys written out or lost
+        self.dropped = 0  # overwritten before they were written out
+        self.last = 0  # length of the text at the last key
+
+    def shown(self, question, ts=None):
+        self.add(question, 0, SHOWN, ts)
+        self.last = 0
+
+    def key(self, question, length, matched, ts=None):
+        # the hot path: called from the entry's trace on every write, so
+        # add() is written out here rather than called
+        i = self.written & self.mask
+        self.ts[i] = perf_counter_ns() if ts is None else ts
+        self.question[i] = question
+        self.length[i] = min(length, 0xFFFF)
+        flags = TYPED if length > self.last else DELETED
+        self.flags[i] = flags | MATCHED if matched else flags
+        self.last = length
+        self.written += 1
+
+    def add(self, question, length, flags, ts=None):
+        i = self.written & self.mask
+        self.ts[i] = perf_counter_ns() if ts is None else ts
+        self.question[i] = question
+        self.length[i] = min(length, 0xFFFF)
+        self.flags[i] = flags
+        self.written += 1
+
+    def __len__(self):
+        # keys waiting to be written out
+        return min(self.written - self.flushed, self.mask + 1)
+
+    def pending(self):
+        # (ts, question, length, flags) of the keys not yet written out,
+        # oldest first
+        start = self.written - len(self)
+        self.dropped += start - self.flushed
+        for n in range(start, self.written):
+            i = n & self.mask
+            yield (self.ts[i], self.question[i], self.length[i],
+                   self.flags[i])
+
+    def flush(self, filename):
+        # appends the waiting keys to filename; returns how many
+        n = len(self)
+        if not n:
+            return 0
+        offset = time_ns() - perf_counter_ns()
+        buf = bytearray(n * RECORD.size)
+        for k, (ts, question, length, flags) in enumerate(self.pending()):
+            RECORD.pack_into(buf, k * RECORD.size, ts + offset, question,
+                             length, flags)
+        folder = path.dirname(filename)
+        if folder:
+            makedirs(folder, exist_ok=True)
+        with open(filename, "ab") as file:
+            if file.tell() == 0:
+                file.write(MAGIC)
+            file.write(buf)
+        self.flushed = self.written
+        return n
+
+
+def read_keys(filename):
+    with open(filename, "rb") as file:
+        data = file.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a key log: " + filename)
+    # a record cut short by a crash is ignored
+    end = len(MAGIC) + (len(data) - len(MAGIC)) // RECORD.size * RECORD.size
+    return RECORD.iter_unpack(memoryview(data)[len(MAGIC):end])
+
+
+def analyse(keys):
+    # keys: (ts, question, length, flags) in order. Returns histograms of
+    # the time to the first key and of the pauses between keys, the
+    # corrections and the questions seen.
+    first = LatencyHistogram()
+    pauses = LatencyHistogram()
+    corrections = questions = 0
+    shown = previous = None
+    for ts, question, length, flags in keys:
+        if flags & SHOWN:
+            questions += 1
+            shown, previous = ts, None
+            continue
+        if flags & DELETED:
+            corrections += 1
+        if previous is None:
+            if shown is not None:
+                first.record(ts - shown)
+        else:
+            pauses.record(ts - previous)
+        previous = ts
+    return first, pauses, corrections, questions
+
+
+def summary(keys):
+    first, pauses, corrections, questions = analyse(keys)
+    lines = ["{} questions, {} corrections".format(questions, corrections)]
+    for name, h in (("first key", first), ("between keys", pauses)):
+        lines.append("{:<14}p50 {:.2f}s  p90 {:.2f}s  p99 {:.2f}s".format(
+            name, *h.percentiles()))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(summary(read_keys(sys.argv[1] if len(sys.argv) > 1
+                            else keys_path())))
@@ -13,14 +13,26 @@
 import tkinter as tk  # used for DISABLED and other key words
 from tkinter import Button, Canvas, Entry, Frame, Label, Radiobutton, Scrollbar
 from tkinter.ttk import Progressbar
-import tkinter.font as font
-from random import randint, sample  # used in generate
-from functools import reduce  # used in factors
-from time import time  # used in game
-import operator  # used in generate
-from itertools import chain  # used in factors
+from time import perf_counter_ns, time_ns  # used in game
+import os  # used in startup_probe, advance_delay
+import sys  # used in startup_probe
+from bisect import bisect_left  # used in SpeedGraph
 from os import path  # used in show_settings
+from generator import generate_main, generate_alt, LEVELS  # used in generate
+from questions import OPS, num  # used in AltGame.generate, QuestionBuffer
+from engine import Engine, FIXED, ENDLESS, SPRINT, LENGTHS  # used in Game
+from prefetch import Prefetcher  # used in MainGame, AltGame
+from animation import Animator  # used in SpeedGraph
+from stats import LatencyHistogram, LearnerProfile, month  # used in game
+import sessionlog  # used in game
+from adaptive import AdaptiveScheduler  # used in game
+from store import Store, store_path  # used in game, LeaderboardScreen
+from keylog import KeyLog, keys_path  # used in game
 from abc import ABC, abstractmethod  # used in Game
+from resources import bgc, sbgc, tbgc, fc, get_font  # used in screens
+import resources as res  # fonts, created on first use
+import tracing  # spans, off unless MENTAL_MATHS_TRACE is set
+from tracing import span, traced
 
 
 class Options(Radiobutton):
@@ -30,16 +42,22 @@ class Options(Radiobutton):
         self["pady"] = 5
         self["indicatoron"] = 0
         self["bg"] = sbgc
-        self["state"] = state
         self["fg"] = "white"
         self["selectcolor"] = tbgc
-        self["font"] = f
+        self["font"] = res.f
         self["command"] = disable_start
 
 
 class SpeedGraph():
-    def __init__(self, canvas, x0, y0, x1, y1, width, avg):
-        self.custom_font = font.Font(family="Consolas", size=20)
+    # drawn once per stats screen, show() re-runs it for a new session
+    # (upper bound in seconds, share of the arc filled); slower than the
+    # last bound fills 0.05
+    steps = ((1, 1), (2, 0.9), (3, 0.8), (5, 0.7), (7, 0.6), (10, 0.5),
+             (12, 0.4), (15, 0.3), (20, 0.2), (30, 0.1))
+    bounds = [b for b, _ in steps]
+
+    def __init__(self, canvas, x0, y0, x1, y1, width):
+        self.custom_font = get_font(20)
         self.canvas = canvas
         self.x0, self.y0 = x0+width, y0+width
         self.x1, self.y1 = x1-width, y1-width
@@ -47,73 +65,141 @@ class SpeedGraph():
         self.width = width
         self.start_angle = -140
         self.current_angle = 0
-        self.running = True
+        self.running = False
+        self.increment = 360 / animator.interval
         # draw static bar outline
-        w2 = width / 2
         self.bg = self.canvas.create_arc(self.x0, self.y0, self.x1, self.y1,
                                          start=self.start_angle, extent=-260,
                                          width=self.width, style='arc',
                                          outline="#2a2a2a")
         # extent must be negative so it is drawn clockwise
-        self.avg = avg
-        if avg == 0:
-            self.per = 0
-            self.running = False
-        elif 0 < avg <= 1:
-            self.per = 1
-        elif 1 < avg <= 2:
-            self.per = 0.9
-        elif 2 < avg <= 3:
-            self.per = 0.8
-        elif 3 < avg <= 5:
-            self.per = 0.7
-        elif 5 < avg <= 7:
-            self.per = 0.6
-        elif 7 < avg <= 10:
-            self.per = 0.5
-        elif 10 < avg <= 12:
-            self.per = 0.4
-        elif 12 < avg <= 15:
-            self.per = 0.3
-        elif 15 < avg <= 20:
-            self.per = 0.2
-        elif 20 < avg <= 30:
-            self.per = 0.1
-        else:
-            self.per = 0.05
-
-        self.limit = (self.per)*260
-        self.start()
-
-    def start(self, interval=30):
-        self.interval = interval
-        self.increment = 360 / interval
         self.filling = self.canvas.create_arc(
             self.x0, self.y0, self.x1, self.y1, start=self.start_angle,
             extent=0, width=self.width, style='arc', outline="#BB86FC"
         )
         self.label_id = self.canvas.create_text(
-            self.labelx, self.labely, text=("{0:0.1f}s").format(self.avg),
-            font=self.custom_font, fill="#BB86FC"
+            self.labelx, self.labely, font=self.custom_font, fill="#BB86FC"
+        )
+        self.tail_id = self.canvas.create_text(
+            self.labelx, self.labely + 35, font=res.f, fill=fc
         )
-        self.canvas.after(500, self.step, self.increment)
-
-    def step(self, delta):
-        if self.running:
-            self.current_angle = (self.current_angle + delta) % 360
-            self.canvas.itemconfigure(self.filling, extent=-self.current_angle)
-            if self.current_angle > self.limit:
-                self.running = False
 
-        self.after_id = self.canvas.after(self.interval, self.step, delta)
+    def show(self, latency):
+        # the needle follows the median time, the p90 is printed below it
+        p50, p90, p99 = latency.percentiles()
+        self.running = latency.count > 0
+        if not self.running:
+            self.per = 0
+        else:
+            i = bisect_left(self.bounds, p50)
+            self.per = self.steps[i][1] if i < len(self.steps) else 0.05
 
+        self.limit = (self.per)*260
+        self.current_angle = 0
+        self.canvas.itemconfigure(self.filling, extent=0)
+        self.canvas.itemconfigure(self.label_id,
+                                  text=("{0:0.1f}s").format(p50))
+        self.canvas.itemconfigure(self.tail_id,
+                                  text=("p90 {0:0.1f}s").format(p90))
+        animator.remove(self.canvas)
+        if self.running:
+            animator.add(self.canvas, self.step, delay=500)
 
-class Result(Label):
-    def __init__(self, master, **kw):
-        Label.__init__(self, master=master, **kw)
-        self["background"] = sbgc
-        self["foreground"] = fc
-        self["font"] = f
+    @traced("SpeedGraph.step")
+    def step(self, now):
+        self.current_angle = (self.current_angle + self.increment) % 360
+        self.canvas.itemconfigure(self.filling, extent=-self.current_angle)
+        if self.current_angle > self.limit:
+            self.running = False
+        return self.running
+
+
+class ResultTable():
+    # Question / answer / time table drawn on one canvas. Only the rows that
+    # fit in the viewport exist as canvas items; scrolling re-binds their
+    # text to other questions, so the cost doesn't grow with the session.
+    columns = (("Question", 18), ("Answer", 10), ("Time", 9))  # in chars
+
+    def __init__(self, master, questions):
+        self.questions = questions
+        self.rowh = res.f.metrics("linespace") + 4
+        cw = res.f.measure("0")
+        self.x = []
+        x = 5
+        for name, width in self.columns:
+            self.x.append(x)
+            x += width * cw
+        self.width = x
+        self.top = 0  # index of the question in the first row
+        self.rows = []  # canvas text ids, one tuple per visible row
+        self.vsb = None
+
+        self.canvas = Canvas(master, bg=sbgc, highlightbackground=sbgc)
+        for x, (name, width) in zip(self.x, self.columns):
+            self.canvas.create_text(x, 0, text=name, anchor="nw", font=res.f,
+                                    fill=fc)
+        self.canvas.bind("<Configure>", self.resize)
+        self.canvas.bind("<MouseWheel>", self.wheel)
+        self.canvas.bind("<Button-4>", self.wheel)
+        self.canvas.bind("<Button-5>", self.wheel)
+
+    def attach(self, vsb):
+        self.vsb = vsb
+        vsb.config(command=self.yview)
+
+    def show(self, questions):
+        self.questions = questions
+        self.canvas.xview_moveto(0)
+        self.scroll_to(0)
+
+    def resize(self, e):
+        need = max(e.height // self.rowh - 1, 1)  # minus the header
+        while len(self.rows) < need:
+            y = (len(self.rows) + 1) * self.rowh
+            self.rows.append(tuple(
+                self.canvas.create_text(x, y, anchor="nw", font=res.f,
+                                        fill=fc)
+                for x in self.x
+            ))
+        while len(self.rows) > need:
+            for i in self.rows.pop():
+                self.canvas.delete(i)
+        self.canvas.config(scrollregion=(0, 0, self.width, e.height))
+        self.scroll_to(self.top)
+
+    def scroll_to(self, top):
+        qs = self.questions
+        n = len(qs)
+        self.top = max(0, min(top, n - len(self.rows)))
+        for r, ids in enumerate(self.rows):
+            i = self.top + r
+            if i < n:
+                text = (qs.format(i), qs.answer_text(i), qs.time_text(i))
+            else:
+                text = ("", "", "")
+            for item, t in zip(ids, text):
+                self.canvas.itemconfigure(item, text=t)
+        if self.vsb is not None:
+            if n:
+                self.vsb.set(self.top / n, (self.top + len(self.rows)) / n)
+            else:
+                self.vsb.set(0, 1)
+
+    def yview(self, *args):
+        # scrollbar protocol: ("moveto", fraction) or ("scroll", n, what)
+        if args[0] == "moveto":
+            self.scroll_to(round(float(args[1]) * len(self.questions)))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= max(len(self.rows) - 1, 1)
+            self.scroll_to(self.top + step)
+
+    def wheel(self, e):
+        if e.num == 4 or e.delta > 0:
+            self.scroll_to(self.top - 3)
+        else:
+            self.scroll_to(self.top + 3)
 
 
 # class ToggleButton(Button):
@@ -140,7 +226,7 @@ class HoverButton(Button):
         self["background"] = self["activebackground"]
 
         self["fg"] = fc
-        self["font"] = f
+        self["font"] = res.f
 
         if self["command"] == "":
             self["command"] = lambda: MainGame(level)
@@ -160,58 +246,59 @@ class HoverButton(Button):
         self["fg"] = fc
 
 
-class Game(ABC):
-    def __init__(self):
-        self.frame = Frame(window, bg=bgc)
-        self.start = 0
-        self.end = 0
-        self.qstart = 0
-        self.qend = 0
-        self.questions = self.generate()
-        self.progress = 0
-        self.cq = self.questions[self.progress]
-        self.sv = tk.StringVar()
-        self.start_questions()
-
-    def factors(self, n):
-        # chain.from_iterable takes (x, y) as input and returns x y
-        return(set(chain.from_iterable(((self.check(i, n//i) for i in range(
-            2, min(int(n**0.5) + 1, 13)) if n % i == 0)))))
-
-    def format_percentage(self, v):
-        p = v["first"]*100
-        if p % 1 != 0.5:
-            p = round(p)
-        return ("{first}% of {second}").format(first=p, second=v["second"])
-
-    def check(self, a, b):
-        if 1 < b < 13:
-            return (a, b)
+# longest question text, and the pixels a label adds around its text
+WIDEST = "99.5% of 1000"
+LABEL_PAD = 8
+
+
+class QuestionBuffer():
+    # one copy of the question labels; QuestionScreen draws the next
+    # question into the hidden copy while the current one is answered, and
+    # only options whose value changed are sent to Tk
+    def __init__(self, master):
+        self.frame = Frame(master, bg=bgc)
+        self.frame.place(relwidth=1, relheight=1)
+        qF = res.qF
+        self.first = Label(self.frame, font=qF, anchor="e", bg=bgc, fg=fc)
+        self.second = Label(self.frame, font=qF, anchor="e", bg=bgc, fg=fc)
+        self.op = Label(self.frame, font=qF, anchor="e", bg=bgc, fg=fc)
+        self.first.grid(row=0, column=0, columnspan=2, sticky="news")
+        self.second.grid(row=1, column=1, sticky="news")
+        self.op.grid(row=1, column=0, sticky="news")
+        self.shown = {}  # (label, option) -> value last set
+        self.one_line = None
+        self.holds = None  # (questions, index) drawn in here
+
+    def set(self, label, **kw):
+        changed = {k: v for k, v in kw.items()
+                   if self.shown.get((label, k)) != v}
+        if changed:
+            label.config(**changed)
+            for k, v in changed.items():
+                self.shown[(label, k)] = v
+
+    def draw(self, questions, i):
+        one_line = not questions.is_normal(i)
+        if one_line != self.one_line:
+            self.one_line = one_line
+            self.frame.columnconfigure(0, weight=int(one_line))
+            self.frame.columnconfigure(1, weight=int(one_line))
+        if one_line:
+            self.set(self.first, anchor="center", text=questions.format(i))
+            self.set(self.second, text="")
+            self.set(self.op, text="")
         else:
-            return(a, a)
+            self.set(self.first, anchor="e", text=num(questions.first[i]))
+            self.set(self.second, text=num(questions.second[i]))
+            self.set(self.op, text=questions.symbol(i))
+        self.holds = (questions, i)
 
-    @abstractmethod
-    def generate(self):
-        pass
-
-    def create_grid(self):
-        self.ans.config(justify=tk.RIGHT)
-        self.first.config(anchor="e", text=self.cq["first"])
-        self.second.config(text=self.cq["second"])
-        self.op.config(text=self.cq["op"])
-        self.iframe.columnconfigure(0, weight=0)
-        self.iframe.columnconfigure(1, weight=0)
-
-    def create_one_line(self):
-        self.ans.config(justify=tk.CENTER)
-        self.iframe.columnconfigure(0, weight=1)
-        self.iframe.columnconfigure(1, weight=1)
-        self.first.config(anchor="center", text=self.cq["format"])
-        self.second.config(text="")
-        self.op.config(text="")
 
-    def start_questions(self):
-        # self.show_stats()
+class QuestionScreen():
+    # built once and handed from game to game
+    def __init__(self):
+        self.game = None
+        self.frame = Frame(window, bg=bgc)
         self.frame.grid(row=0, column=0, sticky="news")
         for i in range(3):
             self.frame.rowconfigure(i, weight=1)
@@ -220,165 +307,421 @@ class Game(ABC):
                                        length=200, mode="determinate", value=0)
         self.progressbar.grid(row=0, column=1, sticky="ew")
         Button(self.frame, text="x", anchor="se", bg=bgc, fg=fc, bd=0,
-               activebackground=bgc, command=main_menu,
-               font=(font.Font(family="Consolas", size=25))
+               activebackground=bgc, command=self.close, font=get_font(25)
                ).grid(row=0, column=0, sticky="nw")
-        HoverButton(self.frame, command=lambda: self.next_question(True),
+        HoverButton(self.frame, command=lambda: self.game.next_question(True),
                     text="skip").grid(row=2, column=1, sticky="new")
 
+        self.sv = tk.StringVar()
         self.iframe = Frame(self.frame, bg=bgc)
-        self.first = Label(self.iframe, font=qF, anchor="e", bg=bgc, fg=fc)
-        self.second = Label(self.iframe, font=qF, anchor="e", bg=bgc, fg=fc)
-        self.op = Label(self.iframe, font=qF, anchor="e", bg=bgc, fg=fc)
-        self.ans = Entry(self.iframe, font=qF, bg=bgc, fg=fc, width=10,
-                         textvariable=self.sv, insertbackground=fc, bd=0)
-
         self.iframe.grid(row=1, column=1, sticky="news")
         self.iframe.rowconfigure(0, weight=1)
-        self.iframe.rowconfigure(4, weight=1)
-        self.ans.delete(0, "end")
+        self.iframe.rowconfigure(3, weight=1)
+        # both buffers are placed over a holder of fixed size, big enough
+        # for any question, and the front one is raised. Drawing into the
+        # back one can't change the holder, so the question on screen
+        # never moves.
+        qF = res.qF
+        holder = Frame(self.iframe, bg=bgc,
+                       width=qF.measure(WIDEST) + LABEL_PAD,
+                       height=2 * (qF.metrics("linespace") + LABEL_PAD))
+        holder.grid(row=1, column=0, sticky="news")
+        self.front = QuestionBuffer(holder)
+        self.back = QuestionBuffer(holder)
+        self.ans = Entry(self.iframe, font=res.qF, bg=bgc, fg=fc, width=10,
+                         textvariable=self.sv, insertbackground=fc, bd=0)
+        self.ans.grid(row=2, column=0, sticky="news")
+        self.justify = None
         self.sv.trace_add("write", self.check_value)
+        # ns from leaving a question to the next one being on screen, and
+        # from the right answer to the next question (advance_delay and
+        # all), for tuning the delay; printed with F12
+        self.transition = LatencyHistogram()
+        self.advance = LatencyHistogram()
 
-        if self.cq["op"] not in normal_op:
-            self.create_one_line()
+    def check_value(self, name, index, mode):
+        if self.game is not None:
+            self.game.check_value(name, index, mode)
+
+    def close(self):
+        # an endless game ends with its results, anything else just leaves
+        game = self.game
+        if game is not None and game.engine.length == ENDLESS and \
+                game.engine.count:
+            game.finish()
         else:
-            self.create_grid()
+            main_menu()
 
-        self.first.grid(row=1, column=0, columnspan=2, sticky="news")
-        self.second.grid(row=2, column=1, sticky="news")
-        self.op.grid(row=2, column=0, sticky="news")
-        self.ans.grid(row=3, column=0, columnspan=2, sticky="news")
-        self.ans.focus_set()
+    def show(self, game):
+        self.game = None  # no answer checks while the entry is cleared
+        self.progressbar["value"] = 0
+        self.ans.delete(0, "end")
+        self.front.holds = self.back.holds = None
+        self.game = game
+        self.frame.tkraise()
+
+    def prepare(self, questions, i):
+        # draw question i into the hidden buffer, if it isn't there yet
+        if i < len(questions) and self.back.holds != (questions, i):
+            self.back.draw(questions, i)
+
+    def flip(self, questions, i):
+        # put question i on screen: raise the buffer holding it and clear
+        # the entry
+        self.prepare(questions, i)
+        self.front, self.back = self.back, self.front
+        self.front.frame.tkraise()
+        justify = tk.CENTER if self.front.one_line else tk.RIGHT
+        if justify != self.justify:
+            self.justify = justify
+            self.ans.config(justify=justify)
+        game, self.game = self.game, None  # not a key the learner pressed
+        self.ans.delete(0, "end")
+        self.game = game
 
-        self.start = time()
-        self.qstart = time()
+    def timings(self):
+        return "transition {}, advance {}".format(*(
+            "p50/p90/p99 {:.1f}/{:.1f}/{:.1f} ms".format(
+                *(p * 1e3 for p in h.percentiles()))
+            for h in (self.transition, self.advance)))
 
-    def check_value(self, name, index, mode):
-        if self.sv.get() == self.cq["answer"]:
-            window.after(150, self.next_question)
 
+class StatsScreen():
+    def __init__(self):
+        self.frame = Frame(window, bg=bgc)
+        self.frame.grid(row=0, column=0, sticky="news")
+        self.frame.rowconfigure(0, weight=1)
+        self.frame.rowconfigure(4, weight=1)
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.columnconfigure(3, weight=1)
+        lblFrame = Frame(self.frame, bg=bgc)
+        lblFrame.grid(row=2, column=2, sticky="news")
+        self.time_label = Label(lblFrame, font=res.f, anchor="w", bg=bgc,
+                                fg=fc)
+        self.time_label.grid(row=0, column=0, padx=20, pady=(30, 0),
+                             sticky="news")
+        self.op_label = Label(lblFrame, font=res.sf, anchor="w",
+                              justify=tk.LEFT, bg=bgc, fg=fc)
+        self.op_label.grid(row=1, column=0, padx=20, sticky="news")
+        HoverButton(self.frame, text="choose level", command=main_menu
+                    ).grid(row=3, column=2, padx=10, pady=20, sticky="ew")
+        self.play = HoverButton(self.frame, text="play again",
+                                command=main_menu)
+        self.play.grid(row=3, column=1, padx=10, pady=20, sticky="ew")
+
+        graphFrame = Frame(self.frame, bg=bgc)
+        graphFrame.grid(row=1, column=2, sticky="news")
+        graphCanvas = Canvas(graphFrame, bg=bgc, highlightthickness=0)
+        graphCanvas.grid()
+        self.graph = SpeedGraph(graphCanvas, 50, 50, 250, 250, 15)
+        graphCanvas.create_text(
+            150, 25, text="Median time taken", fill=tbgc, font=get_font(20)
+        )
+
+        oframe = Frame(
+            self.frame, bg=sbgc, bd=5, relief=tk.GROOVE, padx=10
+        )
+        oframe.grid(row=1, column=1, rowspan=2, sticky='nw')
+        oframe.grid_rowconfigure(0, weight=1)
+        oframe.grid_columnconfigure(0, weight=1)
+        # prevents children of the frame resizing frame
+        oframe.grid_propagate(False)
+
+        # only the visible rows of the results are ever drawn
+        self.table = ResultTable(oframe, ())
+        canvas = self.table.canvas
+        canvas.grid(row=0, column=0, sticky="news", padx=20, pady=20)
+
+        # Link a scrollbar to the canvas
+        vsb = Scrollbar(oframe, orient=tk.VERTICAL)
+        vsb.grid(row=0, column=1, sticky='ns', padx=5, pady=5)
+        self.table.attach(vsb)
+
+        hsb = Scrollbar(oframe, orient=tk.HORIZONTAL, command=canvas.xview)
+        hsb.grid(row=1, column=0, sticky="ew", padx=5, pady=5)
+        canvas.configure(xscrollcommand=hsb.set)
+
+        oframe.config(width=400, height=400)
+
+    def show(self, engine, diff):
+        self.time_label.config(text=engine.summary(diff))
+        lines = []
+        for row in engine.latency.summary():
+            line = "{} ({})  p50 {:.1f}s  p90 {:.1f}s  p99 {:.1f}s".format(
+                *row)
+            # from the running profile, no history is read here
+            monthly = profile.get(row[0], month())
+            if monthly is not None and monthly.latency.count:
+                line += "  (month: p90 {:.1f}s, {:.0%} answered)".format(
+                    monthly.latency.quantile(0.9) / 1e9, monthly.accuracy())
+            lines.append(line)
+        self.op_label.config(text="\n".join(lines))
+        self.table.show(engine.results())
+        self.graph.show(engine.latency.all)
+        self.frame.tkraise()
+
+    def replay(self, command):
+        self.play.config(command=command)
+
+
+class LeaderboardScreen():
+    # read from the store on its reader threads; the Tk thread only polls
+    # the futures, so a game being written never holds up the menu
+    def __init__(self):
+        self.level = "hard"
+        self.pending = None
+        self.frame = Frame(window, bg=bgc)
+        self.frame.grid(row=0, column=0, sticky="news")
+        self.frame.rowconfigure(0, weight=1)
+        self.frame.rowconfigure(5, weight=1)
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.columnconfigure(3, weight=1)
+        self.headings = []
+        self.labels = []
+        for title, row, col in (("best average per level", 1, 1),
+                                ("top 10", 1, 2),
+                                ("your slowest operators", 3, 1)):
+            heading = Label(self.frame, text=title, font=res.f, anchor="w",
+                            bg=bgc, fg=fc)
+            heading.grid(row=row, column=col, padx=20, pady=(20, 0),
+                         sticky="news")
+            label = Label(self.frame, font=res.sf, anchor="nw",
+                          justify=tk.LEFT, bg=bgc, fg=fc)
+            label.grid(row=row + 1, column=col, padx=20, sticky="news")
+            self.headings.append(heading)
+            self.labels.append(label)
+        HoverButton(self.frame, text="next level", command=self.next_level
+                    ).grid(row=3, column=2, padx=10, pady=(20, 0),
+                           sticky="ew")
+        HoverButton(self.frame, text="return to main menu", command=main_menu
+                    ).grid(row=4, column=2, padx=10, pady=20, sticky="new")
+
+    def show(self):
+        self.headings[1].config(text="top 10: " + self.level)
+        for label in self.labels:
+            label.config(text="...")
+        self.pending = (store.submit(store.best_per_level),
+                        store.submit(store.top, self.level),
+                        store.submit(store.slowest_ops, sessionlog.learner()))
+        self.poll(self.pending)
+        self.frame.tkraise()
+
+    def next_level(self):
+        self.level = LEVELS[(LEVELS.index(self.level) + 1) % len(LEVELS)]
+        self.show()
+
+    def poll(self, pending):
+        if pending is not self.pending:
+            return  # shown again since, the newer poll takes over
+        if not all(f.done() for f in pending):
+            window.after(50, self.poll, pending)
+            return
+        self.pending = None
+        best, top, slowest = (f.result() for f in pending)
+        texts = (
+            ["{:<10} {:5.2f}s  {}".format(*row) for row in best],
+            ["{:>2}. {:5.2f}s  {}".format(n + 1, average, name)
+             for n, (name, average) in enumerate(top)],
+            ["{}  {:5.2f}s  ({} answered)".format(*row) for row in slowest],
+        )
+        for label, lines in zip(self.labels, texts):
+            label.config(text="\n".join(lines) or "no games yet")
+
+
+class Screens():
+    # the question and stats screens are built on first use and then kept
+    def __init__(self):
+        self._question = None
+        self._stats = None
+        self._leaderboard = None
+
+    def question(self):
+        if self._question is None:
+            self._question = QuestionScreen()
+        return self._question
+
+    def stats(self):
+        if self._stats is None:
+            self._stats = StatsScreen()
+        return self._stats
+
+    def leaderboard(self):
+        if self._leaderboard is None:
+            self._leaderboard = LeaderboardScreen()
+        return self._leaderboard
+
+    def timings(self):
+        if self._question is None:
+            return "no questions yet"
+        return self._question.timings()
+
+    def idle(self):
+        # no game owns the question screen any more
+        if self._question is not None:
+            self._question.game = None
+
+
+class Game(ABC):
+    # the Tk view of an Engine: draws its questions, feeds it the answers
+    # typed and records what it reports
+    def __init__(self):
+        self.qend = 0
+        self.matched = 0  # when the right answer was typed
+        self.advance = None  # pending after() to the next question
+        self.started = time_ns()
+        self.token = None  # the game's session in the store
+        self.rows = []  # results not yet handed to the store
+        self.engine = Engine(iter(self.new_batch, None), length)
+        self.engine.listen(self.on_event)
+        self.start_questions()
+
+    @abstractmethod
+    def generate(self):
+        pass
+
+    @abstractmethod
+    def prefetch(self):
+        # start building the next set on the prefetch worker
+        pass
+
+    @abstractmethod
+    def level_code(self, i):
+        # level of question i as stored in the session log
+        pass
+
+    @abstractmethod
+    def level_name(self):
+        # the level or operator settings, as shown on the leaderboard
+        pass
+
+    def new_batch(self):
+        with span("generate"):
+            questions = self.generate()
+        if adaptive:
+            scheduler.build(self.key, questions)
+        if self.engine.length != FIXED:
+            self.prefetch()
+        return(questions)
+
+    def on_event(self, event, engine, *args):
+        if event == "question":
+            self.show_question()
+        elif event == "recorded":
+            self.record(*args)
+        elif event == "batch":
+            # a long game's log stays small; the profile is saved with it,
+            # so it is right even if the game ends before another answer
+            save_history()
+            self.save_results()
+        elif event == "finished":
+            self.show_stats()
+
+    def record(self, qs, i, ns, skip):
+        profile.record(qs.symbol(i), ns, skip)
+        scheduler.record(self.key, qs, i, None if skip else ns / 1e9)
+        # buffered, written out in one go when the game ends
+        session_log.append(qs.ops[i], qs.first[i], qs.second[i], ns,
+                           sessionlog.SKIPPED if skip else sessionlog.CORRECT,
+                           self.level_code(i), self.mode)
+        self.rows.append((qs.ops[i], qs.first[i], qs.second[i], ns, skip))
+
+    def save_results(self, done=False):
+        # queued for the store's writer thread, nothing is written here
+        if self.token is None:
+            self.token = store.begin(sessionlog.learner(), self.mode,
+                                     self.level_name(), self.engine.length,
+                                     self.started)
+        store.add(self.token, self.rows)
+        self.rows = []
+        if done:
+            latency = self.engine.latency
+            store.end(self.token, self.engine.duration(),
+                      latency.all.count, latency.skips,
+                      latency.all.mean() / 1e9 if latency.all.count else None)
+
+    def tick(self):
+        # a sprint's progress bar is its time, and it ends by itself
+        if screens.question().game is not self:
+            return
+        left = self.engine.time_left()
+        if left <= 0:
+            self.engine.finish()
+            return
+        self.progressbar["value"] = 100*self.engine.fraction()
+        window.after(min(250, int(left * 1000) + 1), self.tick)
+
+    def finish(self):
+        # end an endless or sprint game where it is
+        self.engine.finish()
+
+    @traced("start_questions")
+    def start_questions(self):
+        # self.show_stats()
+        screen = self.screen = screens.question()
+        screen.show(self)
+        self.frame = screen.frame
+        self.progressbar = screen.progressbar
+        self.ans, self.sv = screen.ans, screen.sv
+
+        self.engine.start()
+        self.ans.focus_set()
+        if self.engine.length == SPRINT:
+            self.tick()
+
+    def show_question(self):
+        engine = self.engine
+        if engine.length != SPRINT:
+            self.progressbar["value"] = 100*engine.fraction()
+        self.screen.flip(engine.questions, engine.progress)
+        self.start_clock()
+
+    def start_clock(self):
+        # run the layout pass first so the clock starts when the question
+        # is on screen, not when its labels were configured
+        self.frame.update_idletasks()
+        self.engine.present()
+        keylog.shown(self.engine.count, self.engine.qstart)
+        # the next question is drawn off screen once this one is showing
+        window.after_idle(self.screen.prepare, self.engine.questions,
+                          self.engine.progress + 1)
+
+    def check_value(self, name, index, mode):
+        text = self.sv.get()
+        matched = self.engine.matches(text)
+        keylog.key(self.engine.count, len(text), matched)
+        if matched and self.advance is None:
+            self.matched = perf_counter_ns()
+            self.advance = window.after(advance_delay, self.next_question)
+
+    @traced("next_question")
     def next_question(self, skip=False):
-            self.qend = time()
+            if self.advance is not None:
+                if skip:
+                    window.after_cancel(self.advance)
+                    skip = False  # it was answered, the skip came late
+                self.advance = None
+            if screens.question().game is not self:
+                return  # left this game, e.g. through the "x" button
+            self.qend = perf_counter_ns()
+            engine = self.engine
             if (skip):
-                self.cq["time"] = "SKIP"
-            else:
-                self.cq["time"] = self.qend - self.qstart
-            self.progress += 1
-            if self.progress < len(self.questions):
-                self.cq = self.questions[self.progress]
-                self.progressbar["value"] = 100*(
-                    self.progress/len(self.questions)
-                )
-                if self.cq["op"] not in normal_op:
-                    self.create_one_line()
-                else:
-                    self.create_grid()
-                self.ans.delete(0, "end")
-                self.qstart = time()
+                engine.skip(self.qend)
             else:
-                self.end = time()
-                self.show_stats()
+                engine.answer(self.matched)
+            if not engine.finished:
+                self.screen.transition.record(engine.qstart - self.qend)
+                if not skip:
+                    self.screen.advance.record(engine.qstart - self.matched)
 
+    @traced("show_stats")
     def show_stats(self):
-            self.frame.destroy()
-            self.frame = Frame(window, bg=bgc)
-            self.frame.grid(row=0, column=0, sticky="news")
-            self.frame.rowconfigure(0, weight=1)
-            self.frame.rowconfigure(4, weight=1)
-            self.frame.columnconfigure(0, weight=1)
-            self.frame.columnconfigure(3, weight=1)
-            lblFrame = Frame(self.frame, bg=bgc)
-            # lblFrame.grid_propagate(False)
-            # lblFrame.rowconfigure(0, weight=1)
-            # lblFrame.rowconfigure(3, weight=1)
-            # lblFrame.columnconfigure(0, weight=1)
-            # lblFrame.columnconfigure(2, weight=1)
-            lblFrame.grid(row=2, column=2, sticky="news")
-            diff = self.end-self.start
-            Label(lblFrame, text=("Time taken: {0:0.1f}s".format(diff)),
-                  font=f, anchor="w", bg=bgc, fg=fc
-                  ).grid(row=0, column=0, padx=20, pady=(30, 0), sticky="news")
-
-            avg = c = 0
-            for q in self.questions:
-                if q["time"] != "SKIP":
-                    avg += q["time"]
-                    c += 1
-            if c != 0:
-                avg /= c
-            else:
-                avg = 0
-            # Label(lblFrame, text="Avg time taken: {0:0.1f}s".format(avg),
-            # font=f, anchor="w", bg=bgc, fg=fc).grid(row=1, column=0, padx=20,
-            # sticky="news")
-            HoverButton(self.frame, text="choose level", command=main_menu
-                        ).grid(row=3, column=2, padx=10, pady=20, sticky="ew")
-            # play again button is added on in respective inherited methods
-
-            graphFrame = Frame(self.frame, bg=bgc)
-            graphFrame.grid(row=1, column=2, sticky="news")
-            # graphFrame.grid_propagate(False)
-            graphCanvas = Canvas(graphFrame, bg=bgc, highlightthickness=0)
-            graphCanvas.grid()
-            graph = SpeedGraph(graphCanvas, 50, 50, 250, 250, 15, avg)
-            graphCanvas.create_text(
-                150, 25, text="Average time taken", fill=tbgc,
-                font=(font.Font(family="Consolas", size=20))
-            )
-
-            oframe = Frame(
-                self.frame, bg=sbgc, bd=5, relief=tk.GROOVE, padx=10
-            )
-            oframe.grid(row=1, column=1, rowspan=2, sticky='nw')
-            oframe.grid_rowconfigure(0, weight=1)
-            oframe.grid_columnconfigure(0, weight=1)
-            # prevents children of the frame resizing frame
-            oframe.grid_propagate(False)
-
-            # Add a canvas in that frame
-            canvas = Canvas(oframe, bg=sbgc, highlightbackground=sbgc)
-            canvas.grid(row=0, column=0, sticky="news", padx=20, pady=20)
-
-            # Link a scrollbar to the canvas
-            vsb = Scrollbar(oframe, orient=tk.VERTICAL, command=canvas.yview)
-            vsb.grid(row=0, column=1, sticky='ns', padx=5, pady=5)
-            canvas.configure(yscrollcommand=vsb.set)
-
-            hsb = Scrollbar(oframe, orient=tk.HORIZONTAL, command=canvas.xview)
-            hsb.grid(row=1, column=0, sticky="ew", padx=5, pady=5)
-            canvas.configure(xscrollcommand=hsb.set)
-
-            # Create a frame to contain the results
-            self.iframe = Frame(canvas, bg=sbgc)
-            canvas.create_window((0, 0), window=self.iframe, anchor='nw')
-
-            Result(self.iframe, text="Question"
-                   ).grid(row=0, column=0, padx=5, sticky="news")
-            Result(self.iframe, text="Answer"
-                   ).grid(row=0, column=1, padx=5, sticky="news")
-            Result(self.iframe, text="Time"
-                   ).grid(row=0, column=2, padx=5, sticky="news")
-            global normal_op
-            for c, v in enumerate(self.questions):
-                if v["op"] in normal_op:
-                    Result(self.iframe, text=v["format"]
-                           ).grid(row=c+1, column=0, padx=5, sticky="news")
-                else:
-                    Result(self.iframe, text=v["format"]
-                           ).grid(row=c+1, column=0, padx=5, sticky="news")
-
-                Result(self.iframe, text=v["answer"]
-                       ).grid(row=c+1, column=1, padx=5, sticky="news")
-                if v["time"] == "SKIP":
-                    Result(self.iframe, text=v["time"]
-                           ).grid(row=c+1, column=2, padx=5, sticky="news")
-                else:
-                    Result(self.iframe, text=("{0:0.1f} sec").format(v["time"])
-                           ).grid(row=c+1, column=2, padx=5, sticky="news")
-
-            self.iframe.update_idletasks()  # NEED THIS for BBOX INFO
-            oframe.config(width=400, height=400)
-            canvas.config(scrollregion=canvas.bbox("all"))
+            screens.idle()
+            save_history()
+            self.save_results(done=True)
+            screen = screens.stats()
+            screen.show(self.engine, self.engine.duration())
+            self.frame = screen.frame
+            # play again button is set up in respective inherited methods
 
 
 class MainGame(Game):
@@ -387,257 +730,76 @@ class MainGame(Game):
     # To keep the inheritance of the parent's __init__() function,
     # add a call to the parent's __init__() function:
 
+    mode = sessionlog.MAIN
+
     def __init__(self, level):
         self.difficulty = level
+        self.key = ("main", level)
         super().__init__()
 
+    def level_code(self, i):
+        if self.difficulty in LEVELS:
+            return(LEVELS.index(self.difficulty) + 1)
+        return(0)
+
+    def level_name(self):
+        return(self.difficulty)
+
     def generate(self):
-        questions = []
-        op = {
-            '+': operator.add,
-            '-': operator.sub,
-            'x': operator.mul,
-            '\u00F7': operator.floordiv,
-            "\u00B2": operator.pow,
-            "\u221A": operator.pow,
-            "%": operator.mul,
-            # "£": operator.mul,
-        }
-
-        diff_op = {
-            "warmup": 3,
-            "easy": 3,
-            "medium": 6,
-            "hard": 6,
-        }
-
-        firstswitch_secondadd = {
-            "warmup": (1, 10),
-            "easy": (1, 100),
-            "medium": (10, 1000),
-            "hard": (100, 10000)
-        }
-
-        second_mul = {
-            "warmup": (1, 10),
-            "easy": (1, 10),
-            "medium": (1, 10),
-            "hard": (10, 100)
-        }
-
-        second_sub = {
-            "warmup": 1,
-            "easy": 1,
-            "medium": 10,
-            "hard": 100,
-        }
-
-        exp_switch = {
-            3: "\u00B3",
-            4: "\u2074",
-            5: "\u2075",
-            6: "\u2076",
-        }
-
-        root_switch = {
-            3: "\u221B",
-            4: "\u221C",
-            5: "\u2155",
-            6: "\u2159",
-        }
-
-        per_switch = {
-            "medium": (5, 10),
-            "hard": (1, 10),
-        }
-
-        while len(questions) < 10:
-            q = {
-                "first": "",
-                "op": "",
-                "second": "",
-                "answer": "",
-                "time": 0,
-                "format": "",
-            }
-
-            q["op"] = list(op.keys())[
-                randint(0, diff_op.get(self.difficulty, 6))
-            ]
-
-            global normal_op
-            if q["op"] in normal_op:
-                q["first"] = randint(
-                    *(firstswitch_secondadd.get(self.difficulty, (1, 10)))
-                )
-                if q["op"] == "\u00F7":
-                    f = self.factors(q["first"])
-                    if len(f) == 0:
-                        continue
-                    q["second"] = sample(f, 1)[0]
-                    # second generated from 1-12 factors of the first number
-                elif q["op"] == "-":
-                    q["second"] = randint(
-                        second_sub.get(self.difficulty, 1),
-                        q["first"]
-                    )
-                elif q["op"] == "x":
-                    q["second"] = randint(
-                        *(second_mul.get(self.difficulty, (1, 10)))
-                    )
-                elif q["op"] == "+":
-                    q["second"] = randint(
-                        *(firstswitch_secondadd.get(self.difficulty, (1, 10)))
-                    )  # same as generating first number
-                q["format"] = "{} {} {}".format(
-                    q["first"],
-                    q["op"],
-                    q["second"]
-                )
-            else:
-                if q["op"] == "\u00B2":
-                    q["first"] = randint(1, 10)
-                    if self.difficulty == "medium":
-                        q["second"] = 2
-                    elif self.difficulty == "hard":
-                        q["second"] = randint(2, 3)
-                    q["format"] = "{}{}".format(
-                        q["first"],
-                        exp_switch.get(q["second"], "\u00B2")
-                    )
-                elif q["op"] == "\u221A":
-                    i = 1
-                    if self.difficulty == "medium":
-                        i = 2
-                    elif self.difficulty == "hard":
-                        i = randint(2, 3)
-                    q["second"] = 1/i
-                    q["first"] = randint(1, 10) ** i
-                    q["format"] = "{}{}".format(
-                        root_switch.get(i, "\u221A"),
-                        q["first"]
-                    )
-                elif q["op"] == "%":
-                    x = per_switch.get(self.difficulty, (10, 10))
-                    q["first"] = ((randint(1, 100/x[0])) * x[0]) / 100
-                    q["second"] = randint(1, 100) * x[1]
-                    q["format"] = self.format_percentage(q)
-                    # percentage = level1: 10s, level2: 5s w/ large numbers,
-                    # level3: 1s w/ large numbers, level4: 1s with small number
-                    # level5: 0.5s with any range
-            q["answer"] = op[q["op"]](q["first"], q["second"])
-            if q["answer"] % 1 == 0:
-                q["answer"] = str(round(q["answer"]))
-            else:
-                q["answer"] = str(round(q["answer"], 4))
-            questions.append(q)
+        questions = prefetcher.take(self.key)
+        if questions is None:
+            questions = generate_main(self.difficulty)
         return(questions)
 
+    def prefetch(self):
+        prefetcher.request(self.key, generate_main, self.difficulty)
+
     def show_stats(self):
         super().show_stats()
-        HoverButton(self.frame, text="play again", level=self.difficulty
-                    ).grid(row=3, column=1, padx=10, pady=20, sticky="ew")
+        # build the next set while the results are on screen
+        self.prefetch()
+        screens.stats().replay(lambda: MainGame(self.difficulty))
 
 
 class AltGame(Game):
+    mode = sessionlog.ALT
+
     def __init__(self, var):
         self.var = var
+        # the menu can't change during a game, so the IntVars are read once
+        selected_op = self.selected_op()
+        self.levels = {s: var for var, s in selected_op}
+        self.key = ("alt", selected_op)
         super().__init__()
 
-    def generate(self):
-        questions = []
-        op = {
-            '+': operator.add,
-            '-': operator.sub,
-            'x': operator.mul,
-            '\u00F7': operator.floordiv,
-            "\u00B2": operator.pow,
-            "\u221A": operator.pow,
-            "%": operator.mul,
-            # "£": operator.mul,
-        }
-
-        per_alt_switch = {
-            1: (10, 10),  # multiples of ten for second
-            2: (5, 10),
-            3: (1, 10),
-            4: (1, 1),  # no multiple, therefore smaller numbers
-            5: (0.5, 10),
-        }
-
-        selected_op = [
-            (self.var[c].get(), v) for c, v in enumerate(list(op.keys()))
+    def selected_op(self):
+        # read on the Tk thread, the worker only ever sees the tuple
+        return(tuple(
+            (self.var[c].get(), v) for c, v in enumerate(OPS)
             if self.var[c].get() != 0
-        ]
-
-        while len(questions) < 10:
-            q = {
-                "first": "",
-                "op": "",
-                "second": "",
-                "answer": "",
-                "time": 0,
-                "format": "",
-            }
-            index = randint(0, len(selected_op) - 1)
-            q["op"] = selected_op[index][1]
-            var = selected_op[index][0]
-
-            global normal_op
-            if q["op"] in normal_op:
-                bound = 10**(var)
-                q["first"] = randint(bound//10, bound)
-                if q["op"] == "\u00F7":
-                    f = self.factors(q["first"])
-                    if len(f) == 0:
-                        continue
-                    q["second"] = sample(f, 1)[0]
-                    # second generated from 1-12 factors of the first number
-                elif q["op"] == "-":
-                    q["second"] = randint(1, q["first"])
-                elif q["op"] == "x":
-                    q["second"] = randint(1, 12)
-                elif q["op"] == "+":
-                    q["second"] = randint(1, bound)
-                    # same as generating first number
-                q["format"] = "{} {} {}".format(
-                    q["first"],
-                    q["op"],
-                    q["second"]
-                )
-            else:
-                bound = 10*(var)
-                if q["op"] == "\u00B2":
-                    q["first"] = randint(1, bound)
-                    # NOTE: base only between 1 and 10 for now
-                    q["second"] = 2
-                    q["format"] = "{}{}".format(q["first"], q["op"])
-                elif q["op"] == "\u221A":
-                    q["first"] = randint(1, bound) ** 2
-                    q["second"] = 1/2
-                    q["format"] = "{}{}".format(q["op"], q["first"])
-                elif q["op"] == "%":
-                    x = per_alt_switch.get(var, (10, 10))
-                    q["first"] = ((randint(1, 100/x[0])) * x[0]) / 100
-                    q["second"] = randint(1, 100) * x[1]
-                    q["format"] = self.format_percentage(q)
-                    # percentage = level1: 10s, level2: 5s w/ large numbers,
-                    # level3: 1s w/ large numbers, level4: 1s with small number
-                    # level5: 0.5s with any range
-
-            q["answer"] = op[q["op"]](q["first"], q["second"])
-            if q["answer"] % 1 == 0:
-                q["answer"] = str(round(q["answer"]))
-            else:
-                q["answer"] = str(round(q["answer"], 4))
+        ))
 
-            questions.append(q)
+    def level_code(self, i):
+        return(self.levels[self.engine.questions.symbol(i)])
+
+    def level_name(self):
+        # the same "x:2 %:1" the terminal game and server take
+        return(" ".join("{}:{}".format(s, var) for var, s in self.key[1]))
+
+    def generate(self):
+        questions = prefetcher.take(self.key)
+        if questions is None:
+            questions = generate_alt(self.key[1])
         return(questions)
 
+    def prefetch(self):
+        selected_op = self.key[1]
+        prefetcher.request(self.key, generate_alt, selected_op)
+
     def show_stats(self):
         super().show_stats()
-        HoverButton(self.frame, text="play again", command=lambda: AltGame(v)
-                    ).grid(row=3, column=1, padx=10, pady=20, sticky="ew")
+        self.prefetch()
+        screens.stats().replay(lambda: AltGame(v))
 
 # def show_settings():
 #     settings = Frame(window, bg=bgc)
@@ -650,61 +812,22 @@ class AltGame(Game):
 #     ToggleButton(settings, text="Night Mode", alttext="Light Mode").grid()
 
 
-def main_menu():
-    global currentmode
-    if currentmode == "main":
-        main.tkraise()
-    elif currentmode == "alt":
-        altmain.tkraise()
-
-
-def switch_mode():
-    global currentmode
-    if currentmode == "main":
-        currentmode = "alt"
-    else:
-        currentmode = "main"
-    main_menu()
-
-
-def disable_start():
-    global v, alt_start
-    flag = True
-    for i in v:
-        if i.get() != 0:
-            flag = False
-            break
-
-    if (flag):
-        alt_start.config(state=tk.DISABLED)
-    else:
-        alt_start.config(state=tk.NORMAL)
-
+def widget_count(w=None):
+    # live widgets under the window, should stay flat over many games
+    if w is None:
+        w = window
+    return sum(1 + widget_count(c) for c in w.winfo_children())
 
-if __name__ == "__main__":
-    window = tk.Tk()
-    window.geometry("800x600")
-    window.title("Mental Maths")
-    window.rowconfigure(0, weight=1)
-    window.columnconfigure(0, weight=1)
 
-    # CONSTANTS
-    bgc = "#1d1d1d"
-    sbgc = "#2a2a2a"  # 363636?
-    tbgc = "#BB86FC"
-    fc = "white"
-    f = font.Font(family="Consolas", size=15)
-    sf = font.Font(family="Consolas", size=10)
-    qF = font.Font(family="Consolas", size=50)
-    all_op = ["+", "-", "x", "\u00F7", "\u00B2", "\u221A", "%", "?"]
-    # add, sub, mul, div, exponent, percentage, money, fraction
-    normal_op = ["+", "-", "x", "\u00F7"]
+def save_history():
+    keylog.flush(keys_path())
+    if session_log.flush():
+        profile.save(sessionlog.profile_path())
 
-    currentmode = "main"
 
-    # BUILDING MAIN MENU
+def build_main_menu():
     main = Frame(window, bg=bgc)
-    main.rowconfigure(7, weight=1)
+    main.rowconfigure(9, weight=1)
     main.columnconfigure(0, weight=1)
     main.grid(row=0, column=0, sticky="news")
 
@@ -728,15 +851,25 @@ if __name__ == "__main__":
         main, activebackground="#432967", level="difficult", state=tk.DISABLED,
         text="difficult\n+, -, x, \u00F7, \u00B2, \u00B3, \u221A, \u221B, %"
     )
+    adapt = HoverButton(main, text=adaptive_text(), command=toggle_adaptive)
+    adaptive_btns.append(adapt)
+    length_btn = HoverButton(main, text=length_text(), command=toggle_length)
+    length_btns.append(length_btn)
     mode = HoverButton(main, text="switch mode", command=switch_mode)
+    board = HoverButton(main, text="leaderboard",
+                        command=lambda: screens.leaderboard().show())
     # settings = HoverButton(main, text="settings", activebackground="#d3d3d3",
     # command=show_settings, state=tk.DISABLED)
-    main_btns = [easy, medium, hard, difficult, mode]
+    main_btns = [easy, medium, hard, difficult, adapt, length_btn, mode,
+                 board]
     warmup.grid(row=0, column=0, padx=20, pady=(20, 5), sticky="ew")
-    for c, v in enumerate(main_btns):
-        v.grid(row=c+1, column=0, padx=20, pady=5, sticky="ew")
+    for c, b in enumerate(main_btns):
+        b.grid(row=c+1, column=0, padx=20, pady=5, sticky="ew")
+    return(main)
 
-    # BUILDING ALT MENU
+
+def build_alt_menu():
+    global v, alt_start
     altmain = Frame(window, bg=bgc)
     for i in range(5):
         altmain.rowconfigure(i, weight=1)
@@ -749,7 +882,7 @@ if __name__ == "__main__":
     row = 1
     col = 1
     for i in all_op:
-        Label(altmain, text=i, bg=bgc, fg=fc, font=f
+        Label(altmain, text=i, bg=bgc, fg=fc, font=res.f
               ).grid(row=row, column=col, sticky="news")
         row += 1
         if i == "\u00F7":
@@ -781,14 +914,150 @@ if __name__ == "__main__":
     btn_frame.grid(row=5, column=1, columnspan=4, sticky="news")
     for i in range(4):
         btn_frame.columnconfigure(i, weight=1)
-    for i in range(2):
+    for i in range(4):
         btn_frame.rowconfigure(i, weight=1)
     alt_start = HoverButton(btn_frame, text="start game",
                             command=lambda: AltGame(v), state=tk.DISABLED)
     alt_start.grid(row=0, column=1, columnspan=2, sticky="ew")
     HoverButton(btn_frame, text="return to main menu", command=switch_mode
                 ).grid(row=1, column=1, columnspan=2, sticky="ew", pady=10)
+    alt_adapt = HoverButton(btn_frame, text=adaptive_text(),
+                            command=toggle_adaptive)
+    alt_adapt.grid(row=2, column=1, columnspan=2, sticky="ew")
+    adaptive_btns.append(alt_adapt)
+    alt_length = HoverButton(btn_frame, text=length_text(),
+                             command=toggle_length)
+    alt_length.grid(row=3, column=1, columnspan=2, sticky="ew", pady=(10, 0))
+    length_btns.append(alt_length)
+    return(altmain)
+
+
+def main_menu():
+    global currentmode, main, altmain
+    screens.idle()
+    save_history()  # keep the answers of a game left part way
+    # each menu is only built the first time it is raised
+    if currentmode == "main":
+        if main is None:
+            main = build_main_menu()
+        main.tkraise()
+    elif currentmode == "alt":
+        if altmain is None:
+            altmain = build_alt_menu()
+        altmain.tkraise()
+
+
+def adaptive_text():
+    return("adaptive: " + ("on" if adaptive else "off"))
+
+
+def toggle_adaptive():
+    global adaptive
+    adaptive = not adaptive
+    for b in adaptive_btns:
+        b.config(text=adaptive_text())
+
+
+def length_text():
+    return("length: " + LENGTHS[length])
+
+
+def toggle_length():
+    global length
+    length = (length + 1) % len(LENGTHS)
+    for b in length_btns:
+        b.config(text=length_text())
+
+
+def switch_mode():
+    global currentmode
+    if currentmode == "main":
+        currentmode = "alt"
+    else:
+        currentmode = "main"
+    main_menu()
+
+
+def disable_start():
+    global v, alt_start
+    # the operator selection changed, a prefetched set is no longer wanted
+    prefetcher.cancel()
+    flag = True
+    for i in v:
+        if i.get() != 0:
+            flag = False
+            break
+
+    if (flag):
+        alt_start.config(state=tk.DISABLED)
+    else:
+        alt_start.config(state=tk.NORMAL)
+
+
+def startup_probe():
+    # for benchmarks/bench_tk_startup.py: report the first frame drawn and
+    # the first time the event loop is idle after it, then quit
+    def first_frame(e):
+        window.unbind("<Expose>")
+        report("first-frame")
+        window.after_idle(interactive)
+
+    def interactive():
+        report("interactive")
+        window.destroy()
+
+    def report(what):
+        sys.stderr.write("{} {} {}\n".format(
+            what, perf_counter_ns(), widget_count()))
+        sys.stderr.flush()
+
+    window.bind("<Expose>", first_frame)
+
+
+if __name__ == "__main__":
+    window = tk.Tk()
+    window.geometry("800x600")
+    window.title("Mental Maths")
+    window.rowconfigure(0, weight=1)
+    window.columnconfigure(0, weight=1)
+
+    all_op = ["+", "-", "x", "\u00F7", "\u00B2", "\u221A", "%", "?"]
+    # add, sub, mul, div, exponent, percentage, money, fraction
+
+    currentmode = "main"
+    prefetcher = Prefetcher(window)
+    animator = Animator(window)
+    screens = Screens()
+    session_log = sessionlog.SessionLog(sessionlog.log_path())
+    keylog = KeyLog()
+    profile = LearnerProfile.load(sessionlog.profile_path())
+    # shared by everyone playing on this machine
+    store = Store(store_path())
+    # weak facts are tracked all the time, adaptive only decides whether
+    # games are built from them
+    scheduler = AdaptiveScheduler()
+    adaptive = False
+    # how long a game runs, cycled by the "length" buttons
+    length = FIXED
+    # ms between typing the right answer and the next question appearing
+    advance_delay = int(os.environ.get("MENTAL_MATHS_ADVANCE_MS", 150))
+    window.bind("<F12>", lambda e: print(
+        "widgets:", widget_count(), "prefetch:", prefetcher.counters(),
+        screens.timings()))
+
+    # menus are built by main_menu when first shown
+    main = None
+    altmain = None
+    v = []
+    alt_start = None
+    adaptive_btns = []
+    length_btns = []
+    if tracing.enabled:
+        tracing.LagProbe(window)
+    if os.environ.get("MENTAL_MATHS_STARTUP_PROBE"):
+        startup_probe()
 
     # START
     main_menu()
     window.mainloop()
+    store.close()
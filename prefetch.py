@@ -0,0 +1,76 @@
+# Builds the next question set on a worker thread while the stats screen is
+# showing, so "play again" does not have to generate on the Tk thread.
+#
+# Tk widgets must only be touched from the main thread, so the worker never
+# calls back into Tk. Instead the main thread polls the pending future with
+# after() and picks the result up when it is done.
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Prefetcher():
+    def __init__(self, widget, poll=50):
+        self.widget = widget  # anything with after(), normally the window
+        self.poll = poll
+        self.executor = ThreadPoolExecutor(max_workers=1,
+                                           thread_name_prefix="prefetch")
+        self.key = None
+        self.future = None
+        self.ready = None
+        self.after_id = None
+        self.hits = 0
+        self.misses = 0
+        self.cancelled = 0
+
+    def request(self, key, fn, *args):
+        # start building fn(*args) for key unless it is already on its way
+        if key == self.key and (self.future or self.ready is not None):
+            return
+        self.cancel()
+        self.key = key
+        self.future = self.executor.submit(fn, *args)
+        self.after_id = self.widget.after(self.poll, self.collect)
+
+    def collect(self):
+        # runs on the Tk thread
+        self.after_id = None
+        if self.future is None:
+            return
+        if not self.future.done():
+            self.after_id = self.widget.after(self.poll, self.collect)
+            return
+        future, self.future = self.future, None
+        if future.exception() is None:
+            self.ready = future.result()
+        else:
+            self.key = None
+
+    def take(self, key):
+        # the prefetched result for key, or None if it isn't ready (the
+        # caller then generates it itself)
+        if key == self.key and self.future is not None and \
+                self.future.done():
+            self.collect()
+        if key == self.key and self.ready is not None:
+            result = self.ready
+            self.key = self.ready = None
+            self.hits += 1
+            return result
+        self.misses += 1
+        if key != self.key:
+            self.cancel()
+        return None
+
+    def cancel(self):
+        # drop whatever is pending, e.g. when the level changes
+        if self.after_id is not None:
+            self.widget.after_cancel(self.after_id)
+            self.after_id = None
+        if self.future is not None:
+            self.future.cancel()
+            self.cancelled += 1
+        self.key = self.future = self.ready = None
+
+    def counters(self):
+        return {"hits": self.hits, "misses": self.misses,
+                "cancelled": self.cancelled}
@@ -0,0 +1,122 @@
+# Question storage and formatting shared by the generator and the game
+# screens. Nothing in here imports tkinter.
+
+from array import array
+from collections import deque
+
+NAN = float("nan")  # time of a skipped question
+RECENT = 100  # questions kept for the results table of a long game
+
+
+OPS = ['+', '-', 'x', '\u00F7', '\u00B2', '\u221A', '%']
+
+exp_switch = {
+    3: "\u00B3",
+    4: "\u2074",
+    5: "\u2075",
+    6: "\u2076",
+}
+
+root_switch = {
+    3: "\u221B",
+    4: "\u221C",
+    5: "\u2155",
+    6: "\u2159",
+}
+
+
+def num(x):
+    # operands are stored as doubles, print whole numbers without ".0"
+    if x % 1 == 0:
+        return int(x)
+    return x
+
+
+def answer_text(a):
+    a = round(a, 4)
+    if a % 1 == 0:
+        return str(int(a))
+    return str(a)
+
+
+def format_question(o, first, second):
+    s = OPS[o]
+    if o < 4:
+        return "{} {} {}".format(num(first), s, num(second))
+    elif s == "\u00B2":
+        return "{}{}".format(num(first),
+                             exp_switch.get(int(second), "\u00B2"))
+    elif s == "\u221A":
+        return "{}{}".format(root_switch.get(round(1/second), "\u221A"),
+                             num(first))
+    # percentage: 0.5% steps are kept, everything else is a whole percent
+    return "{}% of {}".format(num(round(first*100, 1)), num(second))
+
+
+class QuestionSet():
+    # struct-of-arrays: one typed array per field instead of a dict per
+    # question. Skipped questions have a NaN time; the question and answer
+    # text are only built when a screen needs them.
+    __slots__ = ("ops", "first", "second", "answer", "times")
+
+    def __init__(self, n):
+        self.ops = array('B', bytes(n))
+        self.first = array('d', bytes(8*n))
+        self.second = array('d', bytes(8*n))
+        self.answer = array('d', bytes(8*n))
+        self.times = array('d', bytes(8*n))
+
+    def __len__(self):
+        return len(self.ops)
+
+    def symbol(self, i):
+        return OPS[self.ops[i]]
+
+    def is_normal(self, i):
+        return self.ops[i] < 4
+
+    def format(self, i):
+        return format_question(self.ops[i], self.first[i], self.second[i])
+
+    def answer_text(self, i):
+        return answer_text(self.answer[i])
+
+    def skip(self, i):
+        self.times[i] = NAN
+
+    def skipped(self, i):
+        return self.times[i] != self.times[i]
+
+    def time_text(self, i):
+        if self.skipped(i):
+            return "SKIP"
+        return ("{0:0.1f} sec").format(self.times[i])
+
+
+class RecentQuestions():
+    # the last few questions of an endless or sprint game, shown in place
+    # of a QuestionSet by the results table; older ones are dropped
+    __slots__ = ("rows",)
+
+    def __init__(self, size=RECENT):
+        self.rows = deque(maxlen=size)  # (op, first, second, answer, time)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, questions, i):
+        self.rows.append((questions.ops[i], questions.first[i],
+                          questions.second[i], questions.answer[i],
+                          questions.times[i]))
+
+    def format(self, i):
+        return format_question(*self.rows[i][:3])
+
+    def answer_text(self, i):
+        return answer_text(self.rows[i][3])
+
+    def time_text(self, i):
+        t = self.rows[i][4]
+        if t != t:
+            return "SKIP"
+        return ("{0:0.1f} sec").format(t)
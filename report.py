@@ -0,0 +1,210 @@
+# End-of-term report over every learner's session log in a history folder:
+# accuracy and latency percentiles per operator, and for every MainGame
+# level and AltGame setting how many learners played it and how they did.
+#
+#   python report.py                       the history folder in use
+#   python report.py /mnt/kiosks/history -j 8
+#
+# Learners are split into shards that run in a process pool. A worker
+# reads each log through LogReader's column views a block of records at a
+# time, so its memory is one block plus a few dozen running aggregates
+# however long the logs are. Each shard comes back as a partial Report,
+# and partial reports merge by adding counts and histogram buckets.
+
+import argparse
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+from itertools import repeat
+from operator import and_, lshift, or_
+import os
+import sys
+
+from generator import LEVELS
+from questions import OPS
+from sessionlog import ALT, HISTORY_DIR, MAIN, SKIPPED, LogReader
+from stats import RunningStats
+
+SHARD = 32  # learners per task
+BLOCK = 65536  # records read at a time
+SHIFT = 63  # a latency fits below this bit, the record's tags go above it
+LATENCY = (1 << SHIFT) - 1
+
+
+def setting(op, mode, level):
+    # how a record's level is shown: "hard", or "x:3" for AltGame
+    if mode == ALT:
+        return "{}:{}".format(OPS[op], level)
+    if 1 <= level <= len(LEVELS):
+        return LEVELS[level - 1]
+    return "other"
+
+
+def order(k):
+    # operators in OPS order, then the levels, then the AltGame settings
+    if k in OPS:
+        return (0, OPS.index(k))
+    if k in LEVELS or k == "other":
+        return (1, (LEVELS + ["other"]).index(k))
+    s, _, level = k.partition(":")
+    return (2, OPS.index(s), int(level))
+
+
+class Report():
+    def __init__(self):
+        self.learners = 0
+        self.records = 0
+        self.unreadable = []
+        self.groups = {}  # (op, mode, level) -> RunningStats
+        self.players = Counter()  # setting -> learners who played it
+        self.highest = Counter()  # highest MainGame level -> learners
+
+    def scan(self, filename):
+        # adds one learner's log
+        try:
+            log = LogReader(filename)
+        except (OSError, ValueError):
+            self.unreadable.append(filename)
+            return
+        seen = set()  # (op, mode, level) this learner played
+        with log:
+            columns = [log.column("tags"), log.column("latency")]
+            for start in range(0, len(log), BLOCK):
+                self.add_block(*(c[start:start + BLOCK] for c in columns),
+                               seen=seen)
+            self.records += len(log)
+        self.learners += 1
+        self.players.update({setting(*key) for key in seen})
+        levels = [level for op, mode, level in seen if mode == MAIN]
+        if levels:
+            self.highest[setting(0, MAIN, max(levels))] += 1
+
+    def add_block(self, tags, latency, seen):
+        # a block of records as column views. Each record becomes one
+        # number, its op, flags, level and mode above its latency, so a
+        # single sort in C groups the records and orders every group's
+        # times. Python then only loops over the groups.
+        records = sorted(map(or_, map(lshift, tags, repeat(SHIFT)),
+                             latency))
+        start = 0
+        while start < len(records):
+            tag = records[start] >> SHIFT
+            end = bisect_left(records, (tag + 1) << SHIFT, start)
+            op, flags, level, mode = tag.to_bytes(4, sys.byteorder)
+            key = (op, mode, level)
+            entry = self.groups.get(key)
+            if entry is None:
+                entry = self.groups[key] = RunningStats()
+            n = end - start
+            entry.attempts += n
+            if flags & SKIPPED:
+                entry.skips += n
+            else:
+                entry.correct += n
+                entry.latency.extend(list(map(and_, records[start:end],
+                                              repeat(LATENCY))))
+            seen.add(key)
+            start = end
+
+    def merge(self, other):
+        self.learners += other.learners
+        self.records += other.records
+        self.unreadable += other.unreadable
+        for key, entry in other.groups.items():
+            mine = self.groups.get(key)
+            if mine is None:
+                mine = self.groups[key] = RunningStats()
+            mine.merge(entry)
+        self.players.update(other.players)
+        self.highest.update(other.highest)
+
+    def by(self, name):
+        # the groups summed per operator symbol or per setting
+        totals = {}
+        for key, entry in self.groups.items():
+            k = OPS[key[0]] if name == "op" else setting(*key)
+            total = totals.get(k)
+            if total is None:
+                total = totals[k] = RunningStats()
+            total.merge(entry)
+        return totals
+
+    def format(self):
+        lines = ["{:,} learners, {:,} questions".format(self.learners,
+                                                        self.records)]
+        header = "{:<10}{:>9}{:>11}{:>10}{:>8}{:>8}{:>8}"
+        row = "{:<10}{:>9}{:>11,}{:>10.1%}{:>8.1f}{:>8.1f}{:>8.1f}"
+        for title, totals in (("operator", self.by("op")),
+                              ("setting", self.by("setting"))):
+            lines.append("")
+            lines.append(header.format(title, "learners", "attempts",
+                                       "answered", "p50 s", "p90 s",
+                                       "p99 s"))
+            for k in sorted(totals, key=order):
+                e = totals[k]
+                learners = "" if title == "operator" else self.players[k]
+                lines.append(row.format(k, learners, e.attempts,
+                                        e.accuracy(),
+                                        *e.latency.percentiles()))
+        if self.highest:
+            lines.append("")
+            lines.append("highest MainGame level played")
+            for level in LEVELS + ["other"]:
+                if self.highest[level]:
+                    lines.append("{:<10}{:>9}".format(level,
+                                                      self.highest[level]))
+        if self.unreadable:
+            lines.append("")
+            lines.append("{} logs could not be read: {}".format(
+                len(self.unreadable), ", ".join(self.unreadable)))
+        return "\n".join(lines)
+
+
+def scan_shard(files):
+    # runs in a worker
+    report = Report()
+    for filename in files:
+        report.scan(filename)
+    return report
+
+
+def build_report(files, workers=None):
+    shards = [files[i:i + SHARD] for i in range(0, len(files), SHARD)]
+    report = Report()
+    workers = min(workers or os.cpu_count() or 1, len(shards) or 1)
+    if workers == 1:
+        for shard in shards:
+            report.merge(scan_shard(shard))
+        return report
+    with ProcessPoolExecutor(workers) as pool:
+        # partial reports are merged as they come back, with at most 2
+        # shards per worker in flight
+        pending = []
+        for shard in shards:
+            pending.append(pool.submit(scan_shard, shard))
+            if len(pending) >= 2 * workers:
+                report.merge(pending.pop(0).result())
+        for future in pending:
+            report.merge(future.result())
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report over every "
+                                     "learner's history")
+    parser.add_argument("folder", nargs="?", default=HISTORY_DIR,
+                        help="history folder (default: %(default)s)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="processes (default: one per core)")
+    args = parser.parse_args(argv)
+
+    files = sorted(glob(os.path.join(args.folder, "*.mmlog")))
+    if not files:
+        sys.exit("no session logs in " + args.folder)
+    sys.stdout.reconfigure(encoding="utf-8")
+    print(build_report(files, args.workers).format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# Colours and fonts shared by the Tk screens. Fonts need a Tk root, so each
+# one is only created the first time a screen asks for it and is then kept
+# for the rest of the run.
+
+import tkinter.font as font
+
+# CONSTANTS
+bgc = "#1d1d1d"
+sbgc = "#2a2a2a"  # 363636?
+tbgc = "#BB86FC"
+fc = "white"
+
+FAMILY = "Consolas"
+# module attributes that are fonts, e.g. resources.f
+FONT_SIZES = {
+    "f": 15,
+    "sf": 10,
+    "qF": 50,
+}
+
+fonts = {}
+
+
+def get_font(size):
+    # one Font object per size for the whole app
+    if size not in fonts:
+        fonts[size] = font.Font(family=FAMILY, size=size)
+    return fonts[size]
+
+
+def __getattr__(name):
+    # only called while the attribute doesn't exist yet
+    if name in FONT_SIZES:
+        value = globals()[name] = get_font(FONT_SIZES[name])
+        return value
+    raise AttributeError("module {!r} has no attribute {!r}".format(
+        __name__, name))
@@ -0,0 +1,175 @@
+# Classroom server: many students play MainGame levels or AltGame operator
+# selections at once against one process, over a plain line protocol (one
+# command or reply per line, UTF-8). Uses the same generator, QuestionSet
+# and latency statistics as the Tk and terminal games and never imports
+# tkinter.
+#
+#   python server.py [--host 0.0.0.0] [--port 8765]
+#
+# Client                      Server
+#   MAIN <level>                Q <i> <question>      first question
+#   ALT <op>:<level> ...        Q <i> <question>
+#   A <answer>                  RIGHT <seconds>, then the next Q or DONE
+#                               WRONG                 try again
+#   SKIP                        SKIPPED, then the next Q or DONE
+#   QUIT                        BYE
+#                               DONE <total s> <p50> <p90> <p99> <skips>
+#                               ERR <message>
+#
+# Each session runs on an Engine, the same quiz model the Tk game,
+# terminal game and simulations use; a connection only adds the lines its
+# events produce. The time for a question runs from the previous answer
+# (or the start) being read to its own answer arriving.
+
+import argparse
+import asyncio
+from time import perf_counter_ns
+
+from engine import Engine
+from generator import LEVELS, generate_alt, generate_main, parse_alt
+from stats import OperatorLatencies
+
+PORT = 8765
+MAX_LINE = 256  # longer lines from a client are an error
+
+
+class Session():
+    # one connection's game: its Engine and the reply lines the engine's
+    # events have produced since the last write
+    __slots__ = ("engine", "lines")
+
+    def __init__(self, questions):
+        self.engine = Engine(iter((questions,)))
+        self.engine.listen(self.on_event)
+        self.lines = []
+
+    def on_event(self, event, engine, *args):
+        if event == "question":
+            i = args[0]
+            self.lines.append("Q {} {}".format(i, engine.questions.format(i)))
+        elif event == "finished":
+            p50, p90, p99 = engine.latency.all.percentiles()
+            self.lines.append("DONE {:.3f} {:.3f} {:.3f} {:.3f} {}".format(
+                engine.duration(), p50, p90, p99, engine.latency.skips))
+
+    def take(self, first=None):
+        # first, then the pending lines, as one reply
+        lines = ([first] if first else []) + self.lines
+        self.lines = []
+        return "\n".join(lines)
+
+
+class ClassroomServer():
+    def __init__(self):
+        self.connections = 0
+        self.sessions = 0  # finished
+        self.latency = OperatorLatencies()  # every answer, by operator
+
+    def start(self, words, now):
+        if words[0] == "MAIN" and len(words) == 2 and words[1] in LEVELS:
+            session = Session(generate_main(words[1]))
+        elif words[0] == "ALT" and parse_alt(words[1:]) is not None:
+            session = Session(generate_alt(parse_alt(words[1:])))
+        else:
+            return None
+        session.engine.listen(self.on_event)
+        session.engine.start(now)
+        return session
+
+    def on_event(self, event, engine, *args):
+        # every session's answers, for the whole class
+        if event == "recorded":
+            qs, i, ns, skipped = args
+            if skipped:
+                self.latency.skip()
+            else:
+                self.latency.record(qs.symbol(i), ns)
+        elif event == "finished":
+            self.sessions += 1
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        session = None
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    writer.write(b"ERR line too long\n")
+                    break
+                if not line:
+                    break
+                now = perf_counter_ns()
+                session, reply = self.reply(
+                    session, line.decode("utf-8", "replace").split(), now)
+                if reply is None:
+                    writer.write(b"BYE\n")
+                    break
+                writer.write(reply.encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    def reply(self, session, words, now):
+        # (the connection's session from now on, the reply to write), with
+        # reply None to hang up. An answer or skip is followed by the next
+        # question or DONE in the same reply.
+        if not words:
+            return session, "ERR empty line"
+        cmd = words[0]
+        if cmd == "QUIT":
+            return session, None
+        if cmd in ("MAIN", "ALT"):
+            started = self.start(words, now)
+            if started is None:
+                return session, "ERR unknown level or operator"
+            return started, started.take()
+        if session is None:
+            return None, "ERR no game, send MAIN or ALT first"
+        engine = session.engine
+        if cmd == "A" and len(words) == 2:
+            if not engine.matches(words[1]):
+                engine.miss()
+                return session, "WRONG"
+            reply = "RIGHT {:.3f}".format(engine.answer(now) / 1e9)
+        elif cmd == "SKIP":
+            engine.skip(now)
+            reply = "SKIPPED"
+        else:
+            return session, "ERR unknown command"
+        reply = session.take(reply)
+        return (None if engine.finished else session), reply
+
+
+async def serve(host, port, server=None):
+    server = server or ClassroomServer()
+    listener = await asyncio.start_server(server.handle, host, port,
+                                          limit=MAX_LINE)
+    return server, listener
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mental maths classroom "
+                                     "server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+
+    async def run():
+        server, listener = await serve(args.host, args.port)
+        # the real port, --port 0 picks a free one
+        port = listener.sockets[0].getsockname()[1]
+        print("serving on {}:{}".format(args.host, port), flush=True)
+        async with listener:
+            await listener.serve_forever()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
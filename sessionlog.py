@@ -0,0 +1,154 @@
+# Append-only history of every answered or skipped question, one file per
+# learner. Nothing in here imports tkinter.
+#
+# The file is a 16 byte header followed by fixed-width 40 byte records:
+#
+#   offset  type     field
+#        0  int64    ts       wall clock time of the answer (ns since epoch)
+#        8  float64  first    operands as stored in the QuestionSet
+#       16  float64  second
+#       24  int64    latency  ns the question was on screen (0 if skipped)
+#       32  uint8    op       index into questions.OPS
+#       33  uint8    flags    CORRECT / SKIPPED
+#       34  uint8    level    MainGame level (1 = warmup) or AltGame setting
+#       35  uint8    mode     MAIN or ALT
+#       36  4 bytes padding
+#
+# Every record starts on an 8 byte boundary, so the reader can cast the
+# whole mapping once and hand out strided memoryviews of single fields
+# without unpacking records one by one.
+
+from getpass import getuser
+from mmap import mmap, ACCESS_READ
+from os import environ, makedirs, path
+import struct
+from time import time_ns
+
+MAGIC = b"MMLOG\x00\x01\x00"  # name, version 1
+HEADER = MAGIC + bytes(8)
+RECORD = struct.Struct("<qddqBBBB4x")
+
+CORRECT = 1
+SKIPPED = 2
+
+MAIN = 0
+ALT = 1
+
+# field: (memoryview format, byte offset in the record)
+COLUMNS = {
+    "ts": ("q", 0),
+    "first": ("d", 8),
+    "second": ("d", 16),
+    "latency": ("q", 24),
+    "op": ("B", 32),
+    "flags": ("B", 33),
+    "level": ("B", 34),
+    "mode": ("B", 35),
+    # op, flags, level and mode read as one number, for grouping records
+    "tags": ("I", 32),
+}
+
+HISTORY_DIR = environ.get("MENTAL_MATHS_HISTORY", "history")
+
+
+def learner():
+    return environ.get("MENTAL_MATHS_LEARNER") or getuser()
+
+
+def log_path(name=None):
+    return path.join(HISTORY_DIR, (name or learner()) + ".mmlog")
+
+
+def profile_path(name=None):
+    # running per-operator statistics, see stats.LearnerProfile
+    return path.join(HISTORY_DIR, (name or learner()) + ".stats")
+
+
+class SessionLog():
+    # records are packed into memory and written with a single write() per
+    # flush, normally once at the end of a game
+    def __init__(self, filename):
+        self.path = filename
+        self.buffer = bytearray()
+        self.pending = 0
+
+    def append(self, op, first, second, latency, flags, level, mode,
+               ts=None):
+        if ts is None:
+            ts = time_ns()
+        self.buffer += RECORD.pack(ts, first, second, latency, op, flags,
+                                   level, mode)
+        self.pending += 1
+
+    def flush(self):
+        if not self.buffer:
+            return 0
+        folder = path.dirname(self.path)
+        if folder:
+            makedirs(folder, exist_ok=True)
+        with open(self.path, "ab") as file:
+            if file.tell() == 0:
+                file.write(HEADER)
+            file.write(self.buffer)
+        written = self.pending
+        self.buffer = bytearray()
+        self.pending = 0
+        return written
+
+
+class LogReader():
+    # read-only mapping of a log file. Views handed out by column() point
+    # straight into the mapping and stop working once the reader is closed.
+    def __init__(self, filename):
+        self.file = open(filename, "rb")
+        self.map = None
+        self.view = None
+        self.views = []
+        size = path.getsize(filename)
+        # a record cut short by a crash is ignored
+        self.count = max(size - len(HEADER), 0) // RECORD.size
+        if size == 0:
+            return
+        self.map = mmap(self.file.fileno(), 0, access=ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError("not a session log: " + filename)
+        self.view = memoryview(self.map)[
+            len(HEADER):len(HEADER) + self.count * RECORD.size]
+
+    def __len__(self):
+        return self.count
+
+    def column(self, name):
+        fmt, offset = COLUMNS[name]
+        if self.view is None:
+            return memoryview(b"").cast(fmt)
+        if fmt == "B":
+            column = self.view[offset::RECORD.size]
+        else:
+            width = struct.calcsize(fmt)
+            cast = self.view.cast(fmt)
+            self.views.append(cast)
+            column = cast[offset // width::RECORD.size // width]
+        self.views.append(column)
+        return column
+
+    def record(self, i):
+        return RECORD.unpack_from(self.view, i * RECORD.size)
+
+    def close(self):
+        while self.views:
+            self.views.pop().release()
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,147 @@
+# Simulated players: bots with a set speed, error rate and skip rate play
+# whole games through the Engine, on a clock of their own, as fast as the
+# generator and scheduler allow. Used to load-test generation and the
+# adaptive scheduler without a display.
+#
+#   python simulate.py --level hard -s 10000
+#   python simulate.py --alt x:3 %:2 --adaptive --length endless -q 200
+#   python simulate.py --level easy --bots 1.5:0.05:0 4:0.2:0.1
+#
+# A bot is SECONDS:ERRORS:SKIPS, the median time it takes, the chance of
+# giving a wrong answer before the right one and the chance of skipping.
+# Wrong answers go to the engine, and with --adaptive each one counts
+# against its fact in the scheduler like a skip.
+
+import argparse
+from functools import partial
+import random
+from time import perf_counter
+
+from adaptive import AdaptiveScheduler
+from engine import Engine, ENDLESS, FIXED, LENGTHS
+from generator import LEVELS, generate_alt, generate_main, parse_alt
+
+SPREAD = 0.5  # sigma of the log-normal answer time
+
+
+class Bot():
+    def __init__(self, seconds=3.0, errors=0.1, skips=0.02, rng=random):
+        self.seconds = seconds
+        self.errors = errors
+        self.skips = skips
+        self.rng = rng
+
+    def think(self, o):
+        # ns to answer a question with op index o; anything but +, -, x
+        # and division takes half as long again
+        t = self.rng.lognormvariate(0, SPREAD) * self.seconds
+        if o >= 4:
+            t *= 1.5
+        return int(t * 1e9)
+
+    def play(self, engine, now=0, questions=None):
+        # plays until the engine finishes, or for questions answered or
+        # skipped in an endless game; returns the clock at the end
+        rng = self.rng
+        engine.start(now)
+        while not engine.finished:
+            if questions is not None and engine.count >= questions:
+                engine.finish(now)
+                break
+            qs, i = engine.questions, engine.progress
+            now += self.think(qs.ops[i])
+            if rng.random() < self.skips:
+                engine.skip(now)
+                continue
+            while rng.random() < self.errors:
+                engine.miss()
+                now += self.think(qs.ops[i]) // 2
+            engine.answer(now)
+        return now
+
+
+def parse_bot(text):
+    seconds, errors, skips = (float(x) for x in text.split(":"))
+    return seconds, errors, skips
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulated players")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--level", choices=LEVELS)
+    group.add_argument("--alt", nargs="+", metavar="OP:LEVEL")
+    parser.add_argument("-s", "--sessions", type=int, default=1000)
+    parser.add_argument("--length", choices=LENGTHS, default=LENGTHS[FIXED])
+    parser.add_argument("-q", "--questions", type=int, default=100,
+                        help="questions per endless game")
+    parser.add_argument("--bots", nargs="+", type=parse_bot,
+                        default=[(3.0, 0.1, 0.02)],
+                        metavar="SECONDS:ERRORS:SKIPS")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="build sets from each bot's weakest facts")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.level:
+        key = ("main", args.level)
+        generate = partial(generate_main, args.level)
+    else:
+        selected = parse_alt(args.alt)
+        if selected is None:
+            parser.error("expected OP:LEVEL with LEVEL 1-5")
+        key = ("alt", selected)
+        generate = partial(generate_alt, selected)
+    length = LENGTHS.index(args.length)
+    rng = random.Random(args.seed)
+    bots = [Bot(*b, rng=rng) for b in args.bots]
+    # one scheduler per bot, as each would be a different learner
+    schedulers = [AdaptiveScheduler(rng=rng) for _ in bots]
+
+    def batches(scheduler):
+        while True:
+            questions = generate(rng=rng)
+            if args.adaptive:
+                scheduler.build(key, questions)
+            yield questions
+
+    def record(scheduler, event, engine, *rest):
+        if event == "recorded":
+            qs, i, ns, skip = rest
+            scheduler.record(key, qs, i, None if skip else ns / 1e9)
+        elif event == "wrong":
+            qs, i = rest
+            scheduler.record(key, qs, i, None)
+
+    answered = skipped = wrong = 0
+    played = [None] * len(bots)  # last engine of each bot
+    t = perf_counter()
+    for n in range(args.sessions):
+        b = n % len(bots)
+        engine = Engine(batches(schedulers[b]), length)
+        engine.listen(partial(record, schedulers[b]))
+        bots[b].play(engine,
+                     questions=args.questions if length == ENDLESS else None)
+        answered += engine.latency.all.count
+        skipped += engine.latency.skips
+        wrong += engine.wrong
+        played[b] = engine
+    elapsed = perf_counter() - t
+
+    print("{:,} {} sessions in {:.2f} s: {:,.0f} sessions/s, {:,.0f} "
+          "questions/s".format(args.sessions, args.length, elapsed,
+                               args.sessions / elapsed,
+                               (answered + skipped) / elapsed))
+    print("{:,} answered, {:,} skipped, {:,} wrong".format(answered, skipped,
+                                                         wrong))
+    for bot, engine, scheduler in zip(bots, played, schedulers):
+        if engine is None:
+            continue
+        p50, p90, p99 = engine.latency.all.percentiles()
+        print("bot {}s/{:.0%}/{:.0%}: last game {}, p50 {:.1f}s p90 {:.1f}s,"
+              " {:,} facts".format(bot.seconds, bot.errors, bot.skips,
+                                   engine.summary(engine.duration()), p50,
+                                   p90, len(scheduler.bank(key))))
+
+
+if __name__ == "__main__":
+    main()
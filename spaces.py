@@ -0,0 +1,152 @@
+# Question spaces: every question one operator can ask at one level,
+# numbered 0..size-1 so a question is just an index. Operands are worked
+# out from the index (mixed radix for grids, prefix sums for ragged ones)
+# and nothing is enumerated up front, so even the 4 digit spaces cost a
+# few numbers each. A set is drawn by sampling indices without
+# replacement, which gives no repeats and never retries.
+#
+# Division is (divisor, multiple) blocks: for each divisor d in 2-12 the
+# multiples of d in the operand range, other than d itself.
+
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from math import isqrt
+import operator
+
+LOW, HIGH = 2, 12  # divisors a division question can have
+
+
+def sample(rng, n, k):
+    # k indices below n; repeats only once all n have been used
+    idx = []
+    while k >= n > 0:
+        idx.extend(rng.sample(range(n), n))
+        k -= n
+    if k:
+        idx.extend(rng.sample(range(n), k))
+    return idx
+
+
+class Space(ABC):
+    size = 0
+
+    def __len__(self):
+        return self.size
+
+    @abstractmethod
+    def operands(self, idx):
+        # (firsts, seconds, answers) for a list of indices
+        pass
+
+    def question(self, i):
+        a, b, c = self.operands([i])
+        return a[0], b[0], c[0]
+
+    def fill(self, rng, k):
+        # same shape as the old fill_* functions, used by assemble
+        return self.operands(sample(rng, self.size, k))
+
+
+class GridSpace(Space):
+    # every first in one range with every second in another: +, x
+    def __init__(self, first, second, combine):
+        self.a0, self.b0 = first[0], second[0]
+        self.nb = second[1] - second[0] + 1
+        self.size = (first[1] - first[0] + 1) * self.nb
+        self.combine = combine
+
+    def operands(self, idx):
+        a0, b0, nb = self.a0, self.b0, self.nb
+        a = [a0 + i // nb for i in idx]
+        b = [b0 + i % nb for i in idx]
+        return a, b, list(map(self.combine, a, b))
+
+
+class SubtractSpace(Space):
+    # second in [low, first] for each first, so row m (first = a0 + m) has
+    # c + m questions with c = a0 - low + 1
+    def __init__(self, first, low):
+        self.a0, self.low = first[0], low
+        self.c = first[0] - low + 1
+        m = first[1] - first[0] + 1
+        self.size = self.row_start(m)
+
+    def row_start(self, m):
+        return m * self.c + m * (m - 1) // 2
+
+    def operands(self, idx):
+        a0, low, c = self.a0, self.low, self.c
+        d = 2 * c - 1
+        a, b = [], []
+        for i in idx:
+            # largest m with row_start(m) <= i
+            m = (isqrt(d * d + 8 * i) - d) // 2
+            if self.row_start(m) > i:
+                m -= 1
+            a.append(a0 + m)
+            b.append(low + i - self.row_start(m))
+        return a, b, list(map(operator.sub, a, b))
+
+
+class DivisionSpace(Space):
+    def __init__(self, first):
+        lo, hi = first
+        self.blocks = []  # (divisor, first quotient)
+        self.starts = []  # index of each block's first question
+        size = 0
+        for d in range(LOW, HIGH + 1):
+            q0 = max(-(-lo // d), 2)  # d itself is never a question
+            count = hi // d - q0 + 1
+            if count > 0:
+                self.blocks.append((d, q0))
+                self.starts.append(size)
+                size += count
+        self.blocks = tuple(self.blocks)
+        self.starts = tuple(self.starts)
+        self.size = size
+
+    def operands(self, idx):
+        blocks, starts = self.blocks, self.starts
+        a, b, c = [], [], []
+        for i in idx:
+            j = bisect_right(starts, i) - 1
+            d, q0 = blocks[j]
+            q = q0 + i - starts[j]
+            a.append(d * q)
+            b.append(d)
+            c.append(q)
+        return a, b, c
+
+
+class PowerSpace(Space):
+    def __init__(self, base, exps):
+        self.b0 = base[0]
+        self.exps = exps
+        self.size = (base[1] - base[0] + 1) * len(exps)
+
+    def operands(self, idx):
+        b0, exps, n = self.b0, self.exps, len(self.exps)
+        a = [b0 + i // n for i in idx]
+        b = [exps[i % n] for i in idx]
+        return a, b, [x ** y for x, y in zip(a, b)]
+
+
+class RootSpace(PowerSpace):
+    # the root is the index, so the answer is exact
+    def operands(self, idx):
+        roots, degrees, powers = PowerSpace.operands(self, idx)
+        return powers, [1/y for y in degrees], roots
+
+
+class PercentSpace(Space):
+    # x = (percentage step, second step): percentages are multiples of
+    # x[0] up to 100, seconds are 1-100 times x[1]
+    def __init__(self, x):
+        self.x = x
+        self.size = int(100 / x[0]) * 100
+
+    def operands(self, idx):
+        step, scale = self.x
+        a = [(i // 100 + 1) * step / 100 for i in idx]
+        b = [(i % 100 + 1) * scale for i in idx]
+        return a, b, [p * s for p, s in zip(a, b)]
@@ -0,0 +1,269 @@
+# Latency statistics for answered questions, kept as log-bucketed
+# histograms so any percentile can be read back without storing every time.
+# Nothing in here imports tkinter.
+#
+# A value v (in ns) goes into bucket ceil(log(v, GAMMA)), so each bucket
+# covers values within ACCURACY of each other and a quantile read from the
+# buckets is off by at most that much. Histograms with the same GAMMA merge
+# by adding bucket counts, which is what lets learner profiles from
+# different sessions or devices be combined.
+
+from array import array
+from bisect import bisect_right
+from math import ceil, log
+from os import makedirs, path, replace
+import struct
+import sys
+from time import localtime, strftime
+from questions import OPS
+
+ACCURACY = 0.02
+GAMMA = (1 + ACCURACY) / (1 - ACCURACY)
+LOG_GAMMA = log(GAMMA)
+HIST = struct.Struct("<IIqqq")  # count, buckets, total, min, max
+
+
+class LatencyHistogram():
+    __slots__ = ("buckets", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, ns):
+        ns = max(ns, 1)
+        b = ceil(log(ns) / LOG_GAMMA)
+        self.buckets[b] = self.buckets.get(b, 0) + 1
+        self.count += 1
+        self.total += ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if self.max is None or ns > self.max:
+            self.max = ns
+
+    def extend(self, values):
+        # record many values at once, for bulk reads of a session log. The
+        # values are sorted (next to free if they already are) and each
+        # bucket is counted with one bisect, so only the buckets cost
+        # Python code, not the values.
+        values = sorted(values)
+        n = len(values)
+        if not n:
+            return
+        if values[0] < 1:
+            values = [max(v, 1) for v in values]
+        buckets = self.buckets
+        i = 0
+        while i < n:
+            b = ceil(log(values[i]) / LOG_GAMMA)
+            # the end of bucket b, checked against the exact bucket of the
+            # values either side in case of rounding at the edge
+            j = bisect_right(values, GAMMA**b, i, n)
+            while j < n and ceil(log(values[j]) / LOG_GAMMA) == b:
+                j += 1
+            while ceil(log(values[j - 1]) / LOG_GAMMA) != b:
+                j -= 1
+            buckets[b] = buckets.get(b, 0) + j - i
+            i = j
+        self.count += n
+        self.total += sum(values)
+        if self.min is None or values[0] < self.min:
+            self.min = values[0]
+        if self.max is None or values[-1] > self.max:
+            self.max = values[-1]
+
+    def mean(self):
+        if self.count == 0:
+            return 0
+        return self.total / self.count
+
+    def quantile(self, q):
+        # value (ns) at quantile q in [0, 1]; 0 if nothing was recorded
+        if self.count == 0:
+            return 0
+        rank = q * (self.count - 1)
+        seen = 0
+        for b in sorted(self.buckets):
+            seen += self.buckets[b]
+            if seen > rank:
+                # middle of the bucket, clamped to what was actually seen
+                v = 2 * GAMMA**b / (GAMMA + 1)
+                return min(max(v, self.min), self.max)
+        return self.max
+
+    def percentiles(self):
+        # p50, p90 and p99 in seconds
+        return tuple(self.quantile(q) / 1e9 for q in (0.5, 0.9, 0.99))
+
+    def merge(self, other):
+        for b, c in other.buckets.items():
+            self.buckets[b] = self.buckets.get(b, 0) + c
+        self.count += other.count
+        self.total += other.total
+        for v in (other.min, other.max):
+            if v is not None:
+                self.min = v if self.min is None else min(self.min, v)
+                self.max = v if self.max is None else max(self.max, v)
+
+    def to_bytes(self):
+        keys = sorted(self.buckets)
+        return HIST.pack(self.count, len(keys), self.total, self.min or 0,
+                         self.max or 0) + \
+            array('h', keys).tobytes() + \
+            array('I', [self.buckets[k] for k in keys]).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data, offset=0):
+        # returns the histogram and the offset just past it
+        h = cls()
+        h.count, n, h.total, lo, hi = HIST.unpack_from(data, offset)
+        offset += HIST.size
+        keys = array('h', data[offset:offset + 2*n])
+        offset += 2*n
+        counts = array('I', data[offset:offset + 4*n])
+        offset += 4*n
+        h.buckets = dict(zip(keys, counts))
+        if h.count:
+            h.min, h.max = lo, hi
+        return h, offset
+
+
+class OperatorLatencies():
+    # one histogram per operator symbol plus one for everything
+    def __init__(self):
+        self.all = LatencyHistogram()
+        self.ops = {}
+        self.skips = 0
+
+    def record(self, op, ns):
+        self.all.record(ns)
+        h = self.ops.get(op)
+        if h is None:
+            h = self.ops[op] = LatencyHistogram()
+        h.record(ns)
+
+    def skip(self):
+        self.skips += 1
+
+    def summary(self):
+        # (op, count, p50, p90, p99) per operator, times in seconds
+        return [(op, h.count) + h.percentiles()
+                for op, h in self.ops.items()]
+
+
+class RunningStats():
+    # attempts at one operator: updated in O(1) per answer
+    __slots__ = ("attempts", "correct", "skips", "latency")
+
+    def __init__(self):
+        self.attempts = 0
+        self.correct = 0
+        self.skips = 0
+        self.latency = LatencyHistogram()
+
+    def record(self, ns, skipped=False):
+        self.attempts += 1
+        if skipped:
+            self.skips += 1
+        else:
+            self.correct += 1
+            self.latency.record(ns)
+
+    def accuracy(self):
+        if self.attempts == 0:
+            return 0
+        return self.correct / self.attempts
+
+    def merge(self, other):
+        self.attempts += other.attempts
+        self.correct += other.correct
+        self.skips += other.skips
+        self.latency.merge(other.latency)
+
+
+ALL_TIME = "all"
+PROFILE_MAGIC = b"MMSTAT\x00\x01"
+ENTRY = struct.Struct("<7sBIII")  # period, op, attempts, correct, skips
+
+
+def month(ts=None):
+    # period key for a wall clock time in seconds, e.g. "2026-10"
+    return strftime("%Y-%m", localtime(ts))
+
+
+class LearnerProfile():
+    # RunningStats per (period, operator symbol), where period is a month
+    # or ALL_TIME. Answers update two entries, so reading "p90 on \u00F7
+    # this month" never needs the session log.
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, op, period=ALL_TIME):
+        return self.entries.get((period, op))
+
+    def record(self, op, ns, skipped=False, ts=None):
+        for period in (ALL_TIME, month(ts)):
+            entry = self.entries.get((period, op))
+            if entry is None:
+                entry = self.entries[(period, op)] = RunningStats()
+            entry.record(ns, skipped)
+
+    def merge(self, other):
+        for key, entry in other.entries.items():
+            mine = self.entries.get(key)
+            if mine is None:
+                mine = self.entries[key] = RunningStats()
+            mine.merge(entry)
+
+    def to_bytes(self):
+        parts = [PROFILE_MAGIC]
+        for (period, op), e in sorted(self.entries.items()):
+            parts.append(ENTRY.pack(period.encode(), OPS.index(op),
+                                    e.attempts, e.correct, e.skips))
+            parts.append(e.latency.to_bytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:len(PROFILE_MAGIC)] != PROFILE_MAGIC:
+            raise ValueError("not a learner profile")
+        p = cls()
+        offset = len(PROFILE_MAGIC)
+        while offset < len(data):
+            period, op, attempts, correct, skips = ENTRY.unpack_from(
+                data, offset)
+            e = RunningStats()
+            e.attempts, e.correct, e.skips = attempts, correct, skips
+            e.latency, offset = LatencyHistogram.from_bytes(
+                data, offset + ENTRY.size)
+            p.entries[(period.rstrip(b"\x00").decode(), OPS[op])] = e
+        return p
+
+    def save(self, filename):
+        folder = path.dirname(filename)
+        if folder:
+            makedirs(folder, exist_ok=True)
+        with open(filename + ".tmp", "wb") as file:
+            file.write(self.to_bytes())
+        replace(filename + ".tmp", filename)
+
+    @classmethod
+    def load(cls, filename):
+        if not path.exists(filename):
+            return cls()
+        with open(filename, "rb") as file:
+            return cls.from_bytes(file.read())
+
+
+if __name__ == "__main__":
+    # python stats.py merge OUT IN [IN ...]
+    # combines profiles, e.g. the same learner's files from two devices
+    if len(sys.argv) < 4 or sys.argv[1] != "merge":
+        sys.exit("usage: python stats.py merge OUT IN [IN ...]")
+    merged = LearnerProfile()
+    for name in sys.argv[3:]:
+        merged.merge(LearnerProfile.load(name))
+    merged.save(sys.argv[2])
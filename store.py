@@ -0,0 +1,263 @@
+# Shared results store for kiosks and classrooms: players, finished
+# sessions and every question answered, in one SQLite file next to the
+# learners' logs.
+#
+# The database runs in WAL mode, so readers never wait for the writer and
+# the writer never waits for readers. All writes go through one writer
+# thread: begin(), add() and end() only put a job on its queue, and the
+# thread writes everything queued in one transaction, normally once per
+# game. It also creates the file and the schema, so making a Store never
+# waits on the database either. Reads run on a small pool of threads,
+# each with its own connection; submit() hands back a future that the Tk
+# thread can poll with after(), like the Prefetcher.
+#
+# Each leaderboard query is answered from a covering index:
+#   best average per level, top n for a level   sessions_board
+#   a player's slowest operators                results_player
+
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from os import makedirs, path
+import queue
+import sqlite3
+import threading
+from time import time_ns
+import traceback
+
+from engine import FIXED
+from questions import OPS
+from sessionlog import HISTORY_DIR
+
+READERS = 2  # read connections in the pool
+BATCH = 256  # most jobs written in one transaction
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    player INTEGER NOT NULL REFERENCES players (id),
+    mode INTEGER NOT NULL,      -- sessionlog.MAIN or ALT
+    level TEXT NOT NULL,        -- "hard", or "x:2 %:1" for AltGame
+    length INTEGER NOT NULL,    -- engine.FIXED, ENDLESS or SPRINT
+    started INTEGER NOT NULL,   -- ns since epoch
+    seconds REAL,               -- the rest is NULL until the game ends
+    answered INTEGER,
+    skipped INTEGER,
+    average REAL                -- s per answered question
+);
+CREATE TABLE IF NOT EXISTS results (
+    session INTEGER NOT NULL REFERENCES sessions (id),
+    player INTEGER NOT NULL,    -- the session's, so no join is needed
+    op INTEGER NOT NULL,        -- index into questions.OPS
+    first REAL NOT NULL,
+    second REAL NOT NULL,
+    latency INTEGER NOT NULL,   -- ns, 0 if skipped
+    skipped INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_board
+    ON sessions (length, level, average, player);
+CREATE INDEX IF NOT EXISTS results_player
+    ON results (player, skipped, op, latency);
+"""
+
+BEST = """
+SELECT s.level, MIN(s.average), p.name
+FROM sessions AS s JOIN players AS p ON p.id = s.player
+WHERE s.length = ? AND s.average IS NOT NULL
+GROUP BY s.level
+"""
+TOP = """
+SELECT p.name, s.average
+FROM sessions AS s JOIN players AS p ON p.id = s.player
+WHERE s.length = ? AND s.level = ? AND s.average IS NOT NULL
+ORDER BY s.average
+LIMIT ?
+"""
+SLOWEST = """
+SELECT r.op, AVG(r.latency), COUNT(*)
+FROM players AS p JOIN results AS r ON r.player = p.id
+WHERE p.name = ? AND r.skipped = 0
+GROUP BY r.op
+ORDER BY 2 DESC
+"""
+
+
+def store_path():
+    return path.join(HISTORY_DIR, "results.sqlite")
+
+
+def connect(filename):
+    conn = sqlite3.connect(filename, isolation_level=None,
+                           check_same_thread=False)
+    conn.execute("PRAGMA journal_mode = WAL")
+    # in WAL mode a commit is still atomic without a sync per transaction
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA busy_timeout = 5000")
+    return conn
+
+
+class Store():
+    def __init__(self, filename, readers=READERS):
+        # the file and the schema are made on the writer thread, so
+        # nothing here touches the database
+        self.path = filename
+        self.ready = threading.Event()  # set once the schema is there
+        self.tokens = count(1)
+        self.jobs = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop,
+                                       name="store-writer", daemon=True)
+        self.writer.start()
+        self.local = threading.local()
+        self.connections = []  # every reader's, closed by close()
+        self.lock = threading.Lock()
+        self.readers = ThreadPoolExecutor(max_workers=readers,
+                                          thread_name_prefix="store-read")
+
+    # writing, safe to call from any thread and never blocks on the database
+
+    def begin(self, name, mode, level, length, started=None):
+        # a new session for player name; returns the token add() and end()
+        # take
+        token = next(self.tokens)
+        if started is None:
+            started = time_ns()
+        self.jobs.put(("begin", token, name, mode, level, length, started))
+        return token
+
+    def add(self, token, rows):
+        # rows: (op, first, second, latency ns, skipped) per question
+        if rows:
+            self.jobs.put(("add", token, rows))
+
+    def end(self, token, seconds, answered, skipped, average):
+        self.jobs.put(("end", token, seconds, answered, skipped, average))
+
+    def flush(self):
+        # waits until everything queued so far is written
+        done = threading.Event()
+        self.jobs.put(("flush", done))
+        done.wait()
+
+    def close(self):
+        self.jobs.put(None)
+        self.writer.join()
+        self.readers.shutdown()
+        for conn in self.connections:
+            conn.close()
+
+    def create(self):
+        folder = path.dirname(self.path)
+        if folder:
+            makedirs(folder, exist_ok=True)
+        conn = connect(self.path)
+        conn.executescript(SCHEMA)
+        return conn
+
+    def write_loop(self):
+        try:
+            conn = self.create()
+        except Exception:
+            # no database: jobs are dropped, but flush() and close() still
+            # return
+            traceback.print_exc()
+            conn = None
+        self.ready.set()
+        sessions = {}  # token -> (session id, player id)
+        players = {}  # name -> player id
+        while True:
+            jobs = [self.jobs.get()]
+            # everything else that is already waiting goes in the same
+            # transaction
+            while len(jobs) < BATCH and jobs[-1] is not None:
+                try:
+                    jobs.append(self.jobs.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if conn is not None:
+                    self.write_batch(conn, jobs, sessions, players)
+            except Exception:
+                # a bad batch, or a database that stayed busy, is dropped
+                # and the game carries on
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                players.clear()
+                for job in jobs:
+                    if job is not None and job[0] == "begin":
+                        sessions.pop(job[1], None)
+                traceback.print_exc()
+            finally:
+                for done in (j[1] for j in jobs if j and j[0] == "flush"):
+                    done.set()
+            if jobs[-1] is None:
+                if conn is not None:
+                    conn.close()
+                return
+
+    def write_batch(self, conn, jobs, sessions, players):
+        # everything in jobs in one transaction
+        conn.execute("BEGIN IMMEDIATE")
+        for job in jobs:
+            if job is not None and job[0] != "flush":
+                self.write(conn, job, sessions, players)
+        conn.execute("COMMIT")
+
+    def write(self, conn, job, sessions, players):
+        kind, token = job[0], job[1]
+        if kind == "begin":
+            name, mode, level, length, started = job[2:]
+            player = players.get(name)
+            if player is None:
+                conn.execute("INSERT OR IGNORE INTO players (name) "
+                             "VALUES (?)", (name,))
+                player = players[name] = conn.execute(
+                    "SELECT id FROM players WHERE name = ?",
+                    (name,)).fetchone()[0]
+            cur = conn.execute(
+                "INSERT INTO sessions (player, mode, level, length, started)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (player, mode, level, length, started))
+            sessions[token] = cur.lastrowid, player
+        elif token not in sessions:
+            return  # its begin was in a batch that failed
+        elif kind == "add":
+            session, player = sessions[token]
+            conn.executemany(
+                "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(session, player) + tuple(row) for row in job[2]])
+        else:
+            session, player = sessions.pop(token)
+            conn.execute(
+                "UPDATE sessions SET seconds = ?, answered = ?, skipped = ?,"
+                " average = ? WHERE id = ?", job[2:] + (session,))
+
+    # reading, on whatever thread calls; submit() runs it on the pool
+
+    def reader(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            self.ready.wait()
+            conn = self.local.conn = connect(self.path)
+            conn.execute("PRAGMA query_only = ON")
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    def submit(self, fn, *args):
+        return self.readers.submit(fn, *args)
+
+    def best_per_level(self, length=FIXED):
+        # (level, best average s, player) for every level played
+        return self.reader().execute(BEST, (length,)).fetchall()
+
+    def top(self, level, n=10, length=FIXED):
+        # (player, average s) of the n best sessions at level
+        return self.reader().execute(TOP, (length, level, n)).fetchall()
+
+    def slowest_ops(self, name):
+        # (operator, average s, answered) for a player, slowest first
+        return [(OPS[op], latency / 1e9, n) for op, latency, n in
+                self.reader().execute(SLOWEST, (name,))]
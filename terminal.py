@@ -0,0 +1,235 @@
+# Terminal version of the game for machines without a display. It plays
+# the same MainGame levels and AltGame operator/level choices on the same
+# Engine as the Tk game, and never imports tkinter.
+#
+#   python terminal.py                  menu
+#   python terminal.py --level easy     straight into a MainGame level
+#   python terminal.py --alt x:2 %:1    straight into an AltGame selection
+#
+# Keys: type the answer (it is accepted as soon as it matches), Tab skips,
+# Esc goes back to the menu, q quits from a menu.
+
+import argparse
+import curses
+import locale
+import os
+import sys
+
+from engine import Engine
+from generator import LEVELS, generate_alt, generate_main, parse_alt
+from questions import OPS
+from stats import LearnerProfile
+import sessionlog
+
+SKIP_KEYS = ("\t",)
+BACK_KEYS = ("\x1b",)
+
+
+class TerminalGame():
+    # a curses view of an Engine
+    def __init__(self, screen, questions, level_code, mode):
+        self.screen = screen
+        self.engine = Engine(iter((questions,)))
+        self.level_code = level_code  # function of the question index
+        self.mode = mode
+        self.typed = ""
+
+    def draw(self):
+        qs, i = self.engine.questions, self.engine.progress
+        s = self.screen
+        s.erase()
+        h, w = s.getmaxyx()
+        width = max(w - 6, 1)
+        bar = int(width * i / len(qs))
+        s.addstr(0, 2, "[" + "#" * bar + " " * (width - bar) + "]")
+        s.addstr(h // 2 - 1, 2, qs.format(i))
+        s.addstr(h // 2 + 1, 2, "> " + self.typed)
+        s.addstr(h - 1, 2, "Tab: skip   Esc: menu")
+        s.move(h // 2 + 1, 4 + len(self.typed))
+        s.refresh()
+
+    def play(self, log, profile):
+        engine = self.engine
+        self.log, self.profile = log, profile
+        engine.listen(self.on_event)
+        engine.start()
+        while not engine.finished:
+            self.typed = ""
+            self.draw()
+            engine.present()
+            while True:
+                key = self.screen.get_wch()
+                if key in BACK_KEYS:
+                    return False
+                if key in SKIP_KEYS:
+                    engine.skip()
+                    break
+                if key in (curses.KEY_BACKSPACE, "\b", "\x7f"):
+                    self.typed = self.typed[:-1]
+                elif isinstance(key, str) and key.isprintable():
+                    self.typed += key
+                self.draw()
+                if engine.matches(self.typed):
+                    engine.answer()
+                    break
+        return True
+
+    def on_event(self, event, engine, *args):
+        if event == "recorded":
+            self.record(*args)
+
+    def record(self, qs, i, ns, skip):
+        flags = sessionlog.SKIPPED if skip else sessionlog.CORRECT
+        self.log.append(qs.ops[i], qs.first[i], qs.second[i], ns, flags,
+                        self.level_code(i), self.mode)
+        self.profile.record(qs.symbol(i), ns, skip)
+
+    def show_stats(self):
+        engine = self.engine
+        s = self.screen
+        s.erase()
+        h, w = s.getmaxyx()
+        lines = [engine.summary(engine.duration())]
+        p50, p90, p99 = engine.latency.all.percentiles()
+        lines.append("p50 {:.1f}s  p90 {:.1f}s  p99 {:.1f}s".format(
+            p50, p90, p99))
+        for row in engine.latency.summary():
+            lines.append(
+                "  {} ({})  p50 {:.1f}s  p90 {:.1f}s  p99 {:.1f}s".format(
+                    *row))
+        lines.append("")
+        qs = engine.results()
+        for i in range(len(qs)):
+            lines.append("{:<18}{:<10}{}".format(
+                qs.format(i), qs.answer_text(i), qs.time_text(i)))
+        for y, line in enumerate(lines[:h - 2]):
+            s.addstr(y, 2, line[:w - 3])
+        s.addstr(h - 1, 2, "Enter: play again   any other key: menu")
+        s.refresh()
+        return s.get_wch() in ("\n", "\r", curses.KEY_ENTER)
+
+
+def main_menu(screen):
+    # returns ("main", level), ("alt", selected_op) or None to quit
+    choices = LEVELS + ["choose operators"]
+    cur = 0
+    while True:
+        screen.erase()
+        screen.addstr(0, 2, "Mental Maths")
+        for i, name in enumerate(choices):
+            screen.addstr(2 + i, 2, ("> " if i == cur else "  ") + name,
+                          curses.A_REVERSE if i == cur else 0)
+        screen.addstr(3 + len(choices), 2, "Enter: start   q: quit")
+        screen.refresh()
+        key = screen.get_wch()
+        if key == curses.KEY_UP:
+            cur = (cur - 1) % len(choices)
+        elif key == curses.KEY_DOWN:
+            cur = (cur + 1) % len(choices)
+        elif key in ("\n", "\r", curses.KEY_ENTER):
+            if cur < len(LEVELS):
+                return ("main", LEVELS[cur])
+            selected = alt_menu(screen)
+            if selected:
+                return ("alt", selected)
+        elif key == "q":
+            return None
+
+
+def alt_menu(screen, levels=None):
+    # operator rows with a level from 0 (off) to 5, like the Tk alt menu
+    levels = levels or [0] * len(OPS)
+    cur = 0
+    while True:
+        screen.erase()
+        screen.addstr(0, 2, "Choose operators and levels")
+        for i, s in enumerate(OPS):
+            row = " ".join(("[{}]" if c == levels[i] else " {} ").format(
+                "x" if c == 0 else c) for c in range(6))
+            screen.addstr(2 + i, 2, "{}  {}".format(s, row),
+                          curses.A_BOLD if i == cur else 0)
+        screen.addstr(3 + len(OPS), 2,
+                      "arrows: choose   Enter: start   Esc: back")
+        screen.refresh()
+        key = screen.get_wch()
+        if key == curses.KEY_UP:
+            cur = (cur - 1) % len(OPS)
+        elif key == curses.KEY_DOWN:
+            cur = (cur + 1) % len(OPS)
+        elif key == curses.KEY_LEFT:
+            levels[cur] = max(levels[cur] - 1, 0)
+        elif key == curses.KEY_RIGHT:
+            levels[cur] = min(levels[cur] + 1, 5)
+        elif key in ("\n", "\r", curses.KEY_ENTER) and any(levels):
+            return tuple((var, s) for var, s in zip(levels, OPS) if var)
+        elif key in BACK_KEYS:
+            return None
+
+
+def new_game(screen, choice):
+    kind, value = choice
+    if kind == "main":
+        code = LEVELS.index(value) + 1
+        return TerminalGame(screen, generate_main(value), lambda i: code,
+                            sessionlog.MAIN)
+    levels = {s: var for var, s in value}
+    questions = generate_alt(value)
+    return TerminalGame(screen, questions,
+                        lambda i: levels[questions.symbol(i)],
+                        sessionlog.ALT)
+
+
+def run(screen, choice, probe=False):
+    curses.curs_set(1)
+    log = sessionlog.SessionLog(sessionlog.log_path())
+    profile = None
+    try:
+        while True:
+            if choice is None:
+                choice = main_menu(screen)
+                if choice is None:
+                    return
+            game = new_game(screen, choice)
+            if probe:
+                # startup benchmark: stop once the first question is drawn
+                game.engine.start()
+                game.draw()
+                sys.stderr.write("first-question {}\n".format(
+                    int("tkinter" in sys.modules)))
+                sys.stderr.flush()
+                return
+            if profile is None:
+                profile = LearnerProfile.load(sessionlog.profile_path())
+            finished = game.play(log, profile)
+            if log.flush():
+                profile.save(sessionlog.profile_path())
+            if not finished or not game.show_stats():
+                choice = None
+    finally:
+        if log.flush():
+            profile.save(sessionlog.profile_path())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mental maths in a terminal")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--level", choices=LEVELS)
+    group.add_argument("--alt", nargs="+", metavar="OP:LEVEL")
+    parser.add_argument("--startup-probe", action="store_true",
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    choice = None
+    if args.level:
+        choice = ("main", args.level)
+    elif args.alt:
+        selected = parse_alt(args.alt)
+        if selected is None:
+            parser.error("expected OP:LEVEL with LEVEL 1-5")
+        choice = ("alt", selected)
+    locale.setlocale(locale.LC_ALL, "")  # for the operator symbols
+    os.environ.setdefault("ESCDELAY", "25")  # Esc shouldn't lag a second
+    curses.wrapper(run, choice, args.startup_probe)
+
+
+if __name__ == "__main__":
+    main()
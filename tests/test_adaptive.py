@@ -0,0 +1,83 @@
+# The fact bank's indexed heap and the sets the adaptive scheduler builds.
+
+import random
+
+from adaptive import (SKIP_PENALTY, SMOOTHING, AdaptiveScheduler,
+                      FactBank, IndexedHeap)
+from generator import generate_main
+
+
+def check_heap(h):
+    for i, (score, key) in enumerate(h.heap):
+        assert h.pos[key] == i
+        for child in (2*i + 1, 2*i + 2):
+            if child < len(h.heap):
+                assert h.heap[child][0] <= score
+    assert len(h.pos) == len(h.heap)
+
+
+def test_heap_against_a_dict():
+    rng = random.Random(1)
+    h = IndexedHeap()
+    scores = {}
+    for _ in range(2000):
+        key = rng.randrange(100)
+        if scores and rng.random() < 0.2:
+            top, score = h.pop()
+            assert score == max(scores.values())
+            assert scores.pop(top) == score
+        else:
+            score = rng.random()
+            h.push(key, score)
+            scores[key] = score
+        check_heap(h)
+    assert len(h) == len(scores)
+    order = [h.pop() for _ in range(len(h))]
+    assert [score for key, score in order] == \
+        sorted(scores.values(), reverse=True)
+
+
+def test_bank_scores_and_weakest():
+    bank = FactBank()
+    bank.record((2, 7, 8), 56, 4.0)
+    bank.record((2, 7, 8), 56, 2.0)
+    assert bank.score((2, 7, 8)) == 4.0 + SMOOTHING * (2.0 - 4.0)
+    bank.record((0, 1, 1), 2, None)
+    bank.record((1, 9, 3), 6, 1.0)
+    assert bank.score((0, 1, 1)) == SKIP_PENALTY
+    assert bank.weakest(2) == [(0, 1, 1), (2, 7, 8)]
+    # taking the weakest leaves them in the bank
+    assert len(bank) == 3
+    assert bank.weakest(10) == [(0, 1, 1), (2, 7, 8), (1, 9, 3)]
+    check_heap(bank.heap)
+
+
+def facts(questions):
+    return [(questions.ops[i], questions.first[i], questions.second[i])
+            for i in range(len(questions))]
+
+
+def test_build_takes_the_weakest_without_new_repeats():
+    rng = random.Random(2)
+    scheduler = AdaptiveScheduler(rng=rng)
+    for _ in range(20):
+        qs = generate_main("easy", rng=rng)
+        for i in range(len(qs)):
+            scheduler.record("easy", qs, i, rng.random() * 10)
+    weakest = scheduler.bank("easy").weakest(5)
+    for _ in range(50):
+        qs = generate_main("easy", rng=rng)
+        repeats = len(qs) - len(set(facts(qs)))
+        built = facts(scheduler.build("easy", qs))
+        assert set(weakest) <= set(built)
+        assert len(built) - len(set(built)) <= repeats
+        bank = scheduler.bank("easy")
+        for i, fact in enumerate(built):
+            if fact in weakest:
+                assert qs.answer[i] == bank.answers[fact]
+
+
+def test_build_with_an_empty_bank_changes_nothing():
+    qs = generate_main("hard", rng=random.Random(3))
+    before = facts(qs)
+    assert facts(AdaptiveScheduler().build("hard", qs)) == before
@@ -0,0 +1,79 @@
+# Engine transitions for each game length, played on a clock of the
+# test's own.
+
+from engine import ENDLESS, FIXED, SPRINT, Engine
+from generator import SET_SIZE, generate_main
+
+S = 10**9
+
+
+def start(length, sprint_seconds=60):
+    events = []
+    engine = Engine(iter(lambda: generate_main("easy"), None), length,
+                    sprint_seconds)
+    engine.listen(lambda event, engine, *args: events.append(event))
+    engine.start(0)
+    return engine, events
+
+
+def test_fixed_game_finishes_after_one_set():
+    engine, events = start(FIXED)
+    for k in range(1, SET_SIZE + 1):
+        assert not engine.finished
+        assert engine.matches(engine.expected)
+        if k == 3:
+            engine.skip(k * S)
+        else:
+            assert engine.answer(k * S) == S
+    assert engine.finished
+    assert engine.duration() == SET_SIZE
+    assert engine.count == SET_SIZE
+    assert engine.latency.skips == 1
+    assert events.count("question") == SET_SIZE
+    assert events.count("recorded") == SET_SIZE
+    assert "batch" not in events
+    assert events[-1] == "finished"
+    assert engine.results() is engine.questions
+
+
+def test_endless_game_takes_new_sets():
+    engine, events = start(ENDLESS)
+    first = engine.questions
+    for k in range(1, 2 * SET_SIZE + 6):
+        engine.answer(k * S)
+    assert not engine.finished
+    assert engine.questions is not first
+    assert events.count("batch") == 2
+    assert engine.progress == 5
+    assert engine.count == 2 * SET_SIZE + 5
+    assert engine.fraction() == 0.5
+    engine.finish(30 * S)
+    engine.finish(31 * S)
+    assert engine.finished
+    assert events.count("finished") == 1
+    assert engine.duration() == 30
+
+
+def test_sprint_ends_on_time_not_on_sets():
+    engine, events = start(SPRINT, sprint_seconds=15)
+    k = 0
+    while not engine.finished:
+        k += 1
+        engine.answer(k * S)
+    assert k == 15
+    assert events.count("batch") == 1
+    assert engine.time_left(k * S) == 0
+    assert engine.fraction(k * S) == 1
+    assert engine.summary(engine.duration()) == "Answered 15 in 15s"
+
+
+def test_wrong_answers_keep_the_question_up():
+    engine, events = start(FIXED)
+    expected = engine.expected
+    engine.miss()
+    engine.miss()
+    assert engine.wrong == 2
+    assert events.count("wrong") == 2
+    assert engine.progress == 0 and engine.expected == expected
+    assert engine.answer(3 * S) == 3 * S
+    assert engine.latency.all.count == 1
@@ -0,0 +1,51 @@
+# The exported file depends only on the arguments, not on how many
+# processes wrote it.
+
+import csv
+import io
+import json
+
+import pytest
+
+from export import CHUNK, FIELDS, export, main
+
+N = 2 * CHUNK + 7  # two full chunks and a short one
+
+
+def exported(choice, workers, seed=0, fmt="csv", n=N):
+    out = io.StringIO()
+    export(out, choice, n, seed, fmt, workers)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("choice", [("main", "hard"),
+                                    ("alt", ((2, "x"), (1, "%")))])
+def test_same_csv_for_any_workers(choice):
+    one = exported(choice, 1)
+    assert exported(choice, 2) == one
+    assert exported(choice, 3) == one
+    rows = list(csv.reader(io.StringIO(one)))
+    assert tuple(rows[0]) == FIELDS
+    assert [int(row[0]) for row in rows[1:]] == list(range(1, N + 1))
+
+
+def test_same_jsonl_for_any_workers():
+    one = exported(("main", "easy"), 1, fmt="jsonl", n=CHUNK + 1)
+    assert exported(("main", "easy"), 2, fmt="jsonl", n=CHUNK + 1) == one
+    rows = [json.loads(line) for line in one.splitlines()]
+    assert len(rows) == CHUNK + 1
+    assert list(rows[-1]) == list(FIELDS)
+
+
+def test_seed_changes_the_questions():
+    assert exported(("main", "medium"), 1, seed=1, n=100) != \
+        exported(("main", "medium"), 1, seed=2, n=100)
+
+
+def test_command_line(tmp_path):
+    out = tmp_path / "alt.jsonl"
+    main(["--alt", "x:2", "%:1", "-n", "50", "--seed", "7", "-j", "2",
+          "-o", str(out)])
+    assert out.read_text(encoding="utf-8") == \
+        exported(("alt", ((2, "x"), (1, "%"))), 1, seed=7, fmt="jsonl",
+                 n=50)
@@ -0,0 +1,84 @@
+# KeyLog's ring wrapping and what flush() writes out.
+
+import pytest
+
+from keylog import (DELETED, MATCHED, SHOWN, TYPED, KeyLog, analyse,
+                    read_keys)
+
+S = 10**9
+
+
+def test_size_must_be_a_power_of_two():
+    with pytest.raises(ValueError):
+        KeyLog(100)
+
+
+def test_flags():
+    log = KeyLog(8)
+    log.shown(0, ts=0)
+    log.key(0, 1, False, ts=1)
+    log.key(0, 2, True, ts=2)
+    log.key(0, 1, False, ts=3)
+    assert [k[3] for k in log.pending()] == \
+        [SHOWN, TYPED, TYPED | MATCHED, DELETED]
+
+
+def test_ring_wraps_and_counts_what_it_lost():
+    log = KeyLog(8)
+    for n in range(20):
+        log.add(n, n, TYPED, ts=n)
+    assert len(log) == 8
+    assert [k[0] for k in log.pending()] == list(range(12, 20))
+    assert log.dropped == 12
+    assert log.flushed == 0
+
+
+def test_flush_round_trip(tmp_path):
+    filename = str(tmp_path / "keys" / "learner.mmkeys")
+    log = KeyLog(8)
+    assert log.flush(filename) == 0
+    log.shown(0, ts=S)
+    log.key(0, 1, False, ts=2 * S)
+    log.key(0, 2, True, ts=3 * S)
+    assert log.flush(filename) == 3
+    assert len(log) == 0
+    # a second flush appends after the first, past a wrap of the ring
+    for n in range(10):
+        log.add(1, n, TYPED, ts=(4 + n) * S)
+    assert log.flush(filename) == 8
+    assert log.dropped == 2
+    keys = list(read_keys(filename))
+    assert len(keys) == 11
+    # times move to the wall clock but keep their spacing within a flush
+    gaps = [b[0] - a[0] for a, b in zip(keys, keys[1:])]
+    assert gaps[:2] + gaps[3:] == [S] * 9
+    assert [k[1:] for k in keys[:3]] == \
+        [(0, 0, SHOWN), (0, 1, TYPED), (0, 2, TYPED | MATCHED)]
+    assert [k[2] for k in keys[3:]] == list(range(2, 10))
+
+
+def test_partial_record_is_ignored(tmp_path):
+    filename = str(tmp_path / "learner.mmkeys")
+    log = KeyLog(8)
+    log.shown(0, ts=0)
+    log.flush(filename)
+    with open(filename, "ab") as file:
+        file.write(b"\x00" * 5)
+    assert len(list(read_keys(filename))) == 1
+
+
+def test_not_a_key_log(tmp_path):
+    filename = tmp_path / "learner.mmkeys"
+    filename.write_bytes(b"MMLOG\x00\x01\x00")
+    with pytest.raises(ValueError):
+        read_keys(str(filename))
+
+
+def test_analyse():
+    keys = [(0, 0, 0, SHOWN), (2 * S, 0, 1, TYPED), (3 * S, 0, 0, DELETED),
+            (5 * S, 0, 1, TYPED | MATCHED), (6 * S, 1, 0, SHOWN),
+            (7 * S, 1, 1, TYPED)]
+    first, pauses, corrections, questions = analyse(keys)
+    assert (corrections, questions) == (1, 2)
+    assert (first.count, first.min, first.max) == (2, S, 2 * S)
+    assert (pauses.count, pauses.min, pauses.max) == (2, S, 2 * S)
@@ -0,0 +1,100 @@
+# Prefetcher hits, misses and cancels, with a stand-in for the Tk window
+# whose after() callbacks the test runs itself.
+
+import threading
+
+from prefetch import Prefetcher
+
+
+class Window():
+    def __init__(self):
+        self.calls = {}
+        self.ids = 0
+
+    def after(self, ms, fn):
+        self.ids += 1
+        self.calls[self.ids] = fn
+        return self.ids
+
+    def after_cancel(self, after_id):
+        del self.calls[after_id]
+
+    def run(self):
+        # the callbacks that are due, as the event loop would
+        calls, self.calls = self.calls, {}
+        for fn in calls.values():
+            fn()
+
+
+def test_hit_after_the_poll_picks_it_up():
+    window = Window()
+    p = Prefetcher(window)
+    p.request("easy", sum, (1, 2))
+    p.future.result()
+    window.run()
+    assert p.ready == 3 and not window.calls
+    assert p.take("easy") == 3
+    assert p.counters() == {"hits": 1, "misses": 0, "cancelled": 0}
+    # taken once only
+    assert p.take("easy") is None
+    assert p.misses == 1
+
+
+def test_hit_before_the_poll_runs():
+    window = Window()
+    p = Prefetcher(window)
+    p.request("easy", sum, (1, 2))
+    p.future.result()
+    assert p.take("easy") == 3
+    assert p.hits == 1
+
+
+def test_same_key_is_not_requested_twice():
+    window = Window()
+    p = Prefetcher(window)
+    p.request("easy", sum, (1, 2))
+    future = p.future
+    p.request("easy", sum, (5, 5))
+    assert p.future is future
+    future.result()
+    assert p.take("easy") == 3
+
+
+def test_miss_while_still_building():
+    window = Window()
+    p = Prefetcher(window)
+    go = threading.Event()
+    p.request("hard", lambda: go.wait() and "set")
+    assert p.take("hard") is None
+    assert p.misses == 1 and p.cancelled == 0
+    # still on its way for the next game
+    go.set()
+    p.future.result()
+    window.run()
+    assert p.take("hard") == "set"
+
+
+def test_other_key_cancels():
+    window = Window()
+    p = Prefetcher(window)
+    go = threading.Event()
+    p.request("hard", go.wait)
+    p.request("easy", sum, (1, 2))
+    assert p.cancelled == 1
+    assert len(window.calls) == 1
+    # a build that has started can't be stopped; the one worker finishes
+    # it before the next
+    go.set()
+    p.future.result()
+    assert p.take("hard") is None
+    assert p.cancelled == 2 and p.key is None and not window.calls
+
+
+def test_failed_build_is_a_miss():
+    window = Window()
+    p = Prefetcher(window)
+    p.request("easy", lambda: 1 / 0)
+    p.future.exception()
+    window.run()
+    assert p.take("easy") is None
+    assert p.counters() == {"hits": 0, "misses": 1, "cancelled": 0}
@@ -0,0 +1,68 @@
+# The report comes out the same however many processes build it.
+
+import random
+
+from report import SHARD, Report, build_report
+from sessionlog import ALT, CORRECT, MAIN, SKIPPED, SessionLog
+
+
+def write_logs(folder, learners, rng, records=None):
+    # records, if given, gets (op, mode, level, latency, flags) of each
+    files = []
+    for n in range(learners):
+        filename = str(folder / "learner{:03}.mmlog".format(n))
+        log = SessionLog(filename)
+        for _ in range(rng.randrange(1, 60)):
+            mode = rng.choice((MAIN, ALT))
+            level = rng.randrange(1, 5 if mode == MAIN else 6)
+            skipped = rng.random() < 0.1
+            op = rng.randrange(7)
+            latency = 0 if skipped else rng.randrange(10**8, 2 * 10**10)
+            flags = SKIPPED if skipped else CORRECT
+            log.append(op, rng.randrange(100), rng.randrange(1, 13),
+                       latency, flags, level, mode)
+            if records is not None:
+                records.append((op, mode, level, latency, flags))
+        log.flush()
+        files.append(filename)
+    return files
+
+
+def totals(report):
+    return {key: (e.attempts, e.correct, e.skips, e.latency.buckets,
+                  e.latency.total, e.latency.min, e.latency.max)
+            for key, e in report.groups.items()}
+
+
+def test_same_report_for_any_number_of_workers(tmp_path):
+    files = write_logs(tmp_path, 2 * SHARD + 5, random.Random(4))
+    bad = tmp_path / "broken.mmlog"
+    bad.write_bytes(b"not a log at all")
+    files.insert(40, str(bad))
+    one = build_report(files, 1)
+    many = build_report(files, 3)
+    assert one.learners == many.learners == len(files) - 1
+    assert one.unreadable == many.unreadable == [str(bad)]
+    assert totals(one) == totals(many)
+    assert one.players == many.players
+    assert one.highest == many.highest
+    assert one.format() == many.format()
+
+
+def test_scan_matches_the_records(tmp_path):
+    records = []
+    files = write_logs(tmp_path, 3, random.Random(5), records)
+    report = Report()
+    for filename in files:
+        report.scan(filename)
+    expected = {}
+    for op, mode, level, latency, flags in records:
+        e = expected.setdefault((op, mode, level), [0, 0, 0])
+        e[0] += 1
+        if flags & SKIPPED:
+            e[1] += 1
+        else:
+            e[2] += latency
+    assert report.records == len(records)
+    assert {key: [e.attempts, e.skips, e.latency.total]
+            for key, e in report.groups.items()} == expected
@@ -0,0 +1,51 @@
+# What SessionLog writes is what LogReader's columns read back.
+
+from sessionlog import ALT, CORRECT, MAIN, SKIPPED, LogReader, SessionLog
+
+ROWS = [
+    # op, first, second, latency, flags, level, mode, ts
+    (0, 12, 30, 1500000000, CORRECT, 2, MAIN, 1700000000000000000),
+    (3, 144, 12, 0, SKIPPED, 3, ALT, 1700000000500000000),
+    (6, 0.25, 40, 98765, CORRECT, 5, ALT, 1700000001000000000),
+    (5, 81, 0.5, 2**40, CORRECT, 4, MAIN, 1700000002000000000),
+]
+NAMES = ("op", "first", "second", "latency", "flags", "level", "mode", "ts")
+
+
+def test_columns_round_trip(tmp_path):
+    filename = str(tmp_path / "learner.mmlog")
+    log = SessionLog(filename)
+    for row in ROWS[:2]:
+        log.append(*row)
+    assert log.flush() == 2
+    for row in ROWS[2:]:
+        log.append(*row)
+    assert log.flush() == 2
+    assert log.flush() == 0
+    with LogReader(filename) as reader:
+        assert len(reader) == len(ROWS)
+        for k, name in enumerate(NAMES):
+            assert list(reader.column(name)) == [row[k] for row in ROWS]
+        ts, first, second, latency, op, flags, level, mode = reader.record(2)
+        assert (op, first, second, latency, flags, level, mode, ts) == \
+            ROWS[2]
+
+
+def test_partial_record_is_ignored(tmp_path):
+    filename = str(tmp_path / "learner.mmlog")
+    log = SessionLog(filename)
+    log.append(*ROWS[0])
+    log.flush()
+    with open(filename, "ab") as file:
+        file.write(b"\x01" * 10)
+    with LogReader(filename) as reader:
+        assert len(reader) == 1
+        assert list(reader.column("ts")) == [ROWS[0][-1]]
+
+
+def test_empty_log(tmp_path):
+    filename = tmp_path / "learner.mmlog"
+    filename.write_bytes(b"")
+    with LogReader(str(filename)) as reader:
+        assert len(reader) == 0
+        assert list(reader.column("latency")) == []
@@ -0,0 +1,37 @@
+# Every index of a subtraction or division space against the questions
+# found by enumerating them directly.
+
+import pytest
+
+from generator import firstswitch_secondadd, second_sub
+from spaces import HIGH, LOW, DivisionSpace, SubtractSpace
+
+RANGES = sorted(set(firstswitch_secondadd.values()))
+# the 4 digit subtraction spaces have about 50 million questions each
+SUBTRACT = sorted({(first, low) for first in RANGES
+                   for low in second_sub.values()
+                   if first[1] <= 1000 and low <= first[0]})
+
+
+def all_questions(space):
+    return list(zip(*space.operands(range(len(space)))))
+
+
+@pytest.mark.parametrize("first, low", SUBTRACT)
+def test_subtract_space(first, low):
+    expected = [(a, b, a - b) for a in range(first[0], first[1] + 1)
+                for b in range(low, a + 1)]
+    space = SubtractSpace(first, low)
+    assert len(space) == len(expected)
+    assert all_questions(space) == expected
+    assert space.question(len(space) - 1) == expected[-1]
+
+
+@pytest.mark.parametrize("first", RANGES)
+def test_division_space(first):
+    expected = [(a, d, a // d) for d in range(LOW, HIGH + 1)
+                for a in range(first[0], first[1] + 1)
+                if a % d == 0 and a != d]
+    space = DivisionSpace(first)
+    assert len(space) == len(expected)
+    assert all_questions(space) == expected
@@ -0,0 +1,66 @@
+# LearnerProfile survives to_bytes/from_bytes entry for entry, and a
+# histogram built in bulk matches one built value by value.
+
+import random
+
+import pytest
+
+from stats import ALL_TIME, GAMMA, LatencyHistogram, LearnerProfile, month
+
+# two wall clock times in different months
+EARLIER = 1772000000
+LATER = EARLIER + 40 * 86400
+
+
+def profile():
+    p = LearnerProfile()
+    for k in range(50):
+        p.record("+", (k + 1) * 10**8, ts=EARLIER)
+        p.record("\u00F7", (k + 1) * 3 * 10**8, skipped=k % 7 == 0,
+                 ts=LATER)
+    p.record("\u221A", 0, skipped=True, ts=LATER)
+    return p
+
+
+def test_profile_round_trip():
+    p = profile()
+    q = LearnerProfile.from_bytes(p.to_bytes())
+    assert sorted(q.entries) == sorted(p.entries)
+    for key, e in p.entries.items():
+        f = q.entries[key]
+        assert (f.attempts, f.correct, f.skips) == \
+            (e.attempts, e.correct, e.skips)
+        assert f.latency.buckets == e.latency.buckets
+        assert (f.latency.count, f.latency.total, f.latency.min,
+                f.latency.max) == (e.latency.count, e.latency.total,
+                                   e.latency.min, e.latency.max)
+        assert f.latency.percentiles() == e.latency.percentiles()
+    assert q.to_bytes() == p.to_bytes()
+    assert q.get("\u00F7", month(LATER)).skips == 8
+    assert q.get("\u221A").latency.min is None
+
+
+def test_empty_profile_round_trip():
+    q = LearnerProfile.from_bytes(LearnerProfile().to_bytes())
+    assert q.entries == {}
+    assert q.get("+", ALL_TIME) is None
+
+
+def test_not_a_profile():
+    with pytest.raises(ValueError):
+        LearnerProfile.from_bytes(b"MMLOG\x00\x01\x00")
+
+
+def test_extend_matches_record():
+    rng = random.Random(6)
+    for _ in range(50):
+        values = [rng.choice((0, 1, rng.randrange(10**11),
+                              int(GAMMA ** rng.randrange(900))))
+                  for _ in range(rng.randrange(300))]
+        one, bulk = LatencyHistogram(), LatencyHistogram()
+        for v in values:
+            one.record(v)
+        bulk.extend(values)
+        assert (bulk.buckets, bulk.count, bulk.total, bulk.min,
+                bulk.max) == (one.buckets, one.count, one.total, one.min,
+                              one.max)
@@ -0,0 +1,76 @@
+# Store writes through its writer thread and answers the leaderboard
+# queries.
+
+import sqlite3
+
+import pytest
+
+from engine import ENDLESS, FIXED
+from sessionlog import ALT, MAIN
+from store import Store
+
+S = 10**9
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = Store(str(tmp_path / "history" / "results.sqlite"))
+    yield store
+    store.close()
+
+
+def game(store, name, level, average, length=FIXED, mode=MAIN, rows=()):
+    token = store.begin(name, mode, level, length)
+    store.add(token, list(rows))
+    answered = sum(1 for row in rows if not row[4])
+    store.end(token, 10.0, answered, len(rows) - answered, average)
+
+
+def test_leaderboard(store):
+    game(store, "amy", "easy", 2.0)
+    game(store, "bob", "easy", 1.5)
+    game(store, "amy", "easy", 1.0)
+    game(store, "bob", "hard", 4.0)
+    game(store, "cat", "easy", 0.5, length=ENDLESS)
+    game(store, "cat", "x:2", 3.0, mode=ALT)
+    # a game that never ended has no average and is left out
+    store.begin("dan", MAIN, "easy", FIXED)
+    store.flush()
+    assert sorted(store.best_per_level()) == [
+        ("easy", 1.0, "amy"), ("hard", 4.0, "bob"), ("x:2", 3.0, "cat")]
+    assert store.top("easy") == [("amy", 1.0), ("bob", 1.5), ("amy", 2.0)]
+    assert store.top("easy", n=1) == [("amy", 1.0)]
+    assert store.top("easy", length=ENDLESS) == [("cat", 0.5)]
+    assert store.top("medium") == []
+
+
+def test_slowest_ops(store):
+    game(store, "amy", "easy", 2.0, rows=[
+        (0, 1, 2, 1 * S, 0), (0, 3, 4, 3 * S, 0), (3, 8, 2, 5 * S, 0),
+        (3, 9, 3, 0, 1), (1, 9, 3, 1 * S, 0)])
+    game(store, "bob", "easy", 1.0, rows=[(1, 5, 5, 9 * S, 0)])
+    store.flush()
+    assert store.slowest_ops("amy") == [
+        ("\u00F7", 5.0, 1), ("+", 2.0, 2), ("-", 1.0, 1)]
+    assert store.slowest_ops("nobody") == []
+
+
+def test_reads_on_the_pool(store):
+    game(store, "amy", "easy", 2.0)
+    store.flush()
+    assert store.submit(store.top, "easy").result() == [("amy", 2.0)]
+
+
+def test_flush_returns_while_the_database_is_locked(store):
+    game(store, "amy", "easy", 2.0)
+    store.flush()
+    other = sqlite3.connect(store.path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    game(store, "bob", "easy", 1.0)
+    # the batch gives up after the busy timeout and is dropped
+    store.flush()
+    other.execute("ROLLBACK")
+    other.close()
+    game(store, "cat", "easy", 3.0)
+    store.flush()
+    assert store.top("easy") == [("amy", 2.0), ("cat", 3.0)]
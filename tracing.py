@@ -0,0 +1,142 @@
+# Opt-in tracing of the app's phases, for looking into "it feels laggy".
+# Set MENTAL_MATHS_TRACE before starting:
+#
+#   MENTAL_MATHS_TRACE=trace.json python main.py   Chrome trace + summary
+#   MENTAL_MATHS_TRACE=summary python main.py      summary only
+#
+# The trace opens in chrome://tracing or https://ui.perfetto.dev. The
+# summary (count, total and percentiles per span) goes to stderr on exit.
+#
+# Tracing is decided once at import. When it is off, traced() hands back
+# the function it was given and span() a shared do-nothing context
+# manager, so instrumented code costs nothing or one call.
+
+import atexit
+from contextlib import nullcontext
+from functools import wraps
+import json
+import os
+import sys
+import threading
+from time import perf_counter_ns
+
+from stats import LatencyHistogram
+
+TARGET = os.environ.get("MENTAL_MATHS_TRACE", "")
+enabled = bool(TARGET)
+MAX_EVENTS = 1000000  # later events are counted but not kept
+
+START = perf_counter_ns()
+events = []  # (name, start ns, duration ns, thread id)
+counters = []  # (name, ns, value)
+histograms = {}  # name -> LatencyHistogram of durations
+dropped = 0
+NULL = nullcontext()
+
+
+def record(name, start, duration):
+    global dropped
+    h = histograms.get(name)
+    if h is None:
+        h = histograms[name] = LatencyHistogram()
+    h.record(duration)
+    if len(events) < MAX_EVENTS:
+        events.append((name, start, duration, threading.get_ident()))
+    else:
+        dropped += 1
+
+
+class Span():
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, self.start, perf_counter_ns() - self.start)
+        return False
+
+
+def span(name):
+    if not enabled:
+        return NULL
+    return Span(name)
+
+
+def traced(name):
+    # decorator; the function is left untouched when tracing is off
+    def decorate(fn):
+        if not enabled:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kw):
+            start = perf_counter_ns()
+            try:
+                return fn(*args, **kw)
+            finally:
+                record(name, start, perf_counter_ns() - start)
+        return wrapper
+    return decorate
+
+
+class LagProbe():
+    # how late the Tk event loop runs an after() callback: anything past
+    # the interval was spent blocked in some other handler
+    def __init__(self, widget, interval=50):
+        self.widget = widget
+        self.interval = interval
+        self.due = perf_counter_ns() + interval * 1000000
+        widget.after(interval, self.probe)
+
+    def probe(self):
+        now = perf_counter_ns()
+        lag = max(now - self.due, 0)
+        record("event loop lag", self.due, lag)
+        if len(counters) < MAX_EVENTS:
+            counters.append(("event loop lag ms", now, lag / 1e6))
+        self.due = now + self.interval * 1000000
+        self.widget.after(self.interval, self.probe)
+
+
+def chrome_trace():
+    # trace event format, times in microseconds from START
+    pid = os.getpid()
+    trace = [{"name": name, "ph": "X", "pid": pid, "tid": tid,
+              "ts": (start - START) / 1000, "dur": duration / 1000}
+             for name, start, duration, tid in events]
+    trace += [{"name": name, "ph": "C", "pid": pid, "tid": 0,
+               "ts": (ts - START) / 1000, "args": {"value": value}}
+              for name, ts, value in counters]
+    return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+
+def summary():
+    lines = ["{:<24}{:>8}{:>12}{:>10}{:>10}{:>10}{:>10}".format(
+        "span", "count", "total ms", "p50 ms", "p90 ms", "p99 ms",
+        "max ms")]
+    for name in sorted(histograms):
+        h = histograms[name]
+        p50, p90, p99 = h.percentiles()
+        lines.append("{:<24}{:>8}{:>12.1f}{:>10.2f}{:>10.2f}{:>10.2f}"
+                     "{:>10.2f}".format(name, h.count, h.total / 1e6,
+                                        p50 * 1e3, p90 * 1e3, p99 * 1e3,
+                                        h.max / 1e6))
+    if dropped:
+        lines.append("({} events not kept in the trace)".format(dropped))
+    return "\n".join(lines)
+
+
+def dump():
+    if TARGET != "summary":
+        with open(TARGET, "w") as out:
+            json.dump(chrome_trace(), out)
+    print(summary(), file=sys.stderr)
+
+
+if enabled:
+    atexit.register(dump)